@@ -4,10 +4,22 @@ Permite testar os 4 métodos em centenas/milhares de instâncias e agregar resul
 """
 
 import os
-import glob
+import io
+import re
+import csv
+import json
 import time
+import heapq
+import fnmatch
+import pickle
+import hashlib
+import functools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # backend não-interativo: sem init de GUI em servidores
 import matplotlib.pyplot as plt
 from pathlib import Path
 from data_parser import PatientAllocationData
@@ -16,6 +28,255 @@ from metaheuristics import SimulatedAnnealing, TabuSearch
 from hybrid_solver import HybridSolver
 
 
+# Esquema fixo do CSV de resultados (união de todas as colunas possíveis),
+# para poder escrever linha a linha sem depender das colunas dinâmicas
+RESULT_COLUMNS = [
+    'filename', 'num_patients', 'num_wards', 'num_days', 'M',
+    'bb_time', 'bb_objective', 'bb_gap', 'bb_status',
+    'sa_time', 'sa_objective', 'sa_feasible', 'sa_status',
+    'tabu_time', 'tabu_objective', 'tabu_feasible', 'tabu_status',
+    'hybrid_time', 'hybrid_objective', 'hybrid_mh_obj', 'hybrid_improvement',
+    'hybrid_status',
+    'sa_deviation', 'tabu_deviation', 'hybrid_deviation',
+]
+
+# Dtypes por coluna: evita a inferência de tipos do pandas ao ler o CSV
+# e usa float32 nas métricas (metade da memória de float64)
+RESULT_DTYPES = {
+    'filename': 'string',
+    'num_patients': 'Int32',
+    'num_wards': 'Int32',
+    'num_days': 'Int32',
+    'M': 'Int32',
+    'bb_status': 'string',
+    'sa_status': 'string',
+    'tabu_status': 'string',
+    'hybrid_status': 'string',
+    'sa_feasible': 'boolean',
+    'tabu_feasible': 'boolean',
+}
+RESULT_DTYPES.update({
+    col: np.float32 for col in RESULT_COLUMNS if col not in RESULT_DTYPES
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _load_data_cached(filepath, mtime, cache_dir):
+    """Carrega (ou reutiliza) os dados de um ficheiro .dat.
+
+    Cache em dois níveis: lru_cache em memória para o mesmo processo e
+    pickle em disco (keyed por caminho+mtime) para re-runs e outros
+    processos. Varrer os mesmos ficheiros com pesos λ diferentes deixa
+    assim de re-parsear os .dat.
+    """
+    cache_path = None
+    if cache_dir:
+        key = hashlib.md5(f'{filepath}:{mtime}'.encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, f'{key}.pkl')
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+
+    data = PatientAllocationData(filepath)
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f)
+        os.replace(tmp_path, cache_path)
+
+    return data
+
+
+def load_data(filepath, cache_dir=None):
+    """Carrega um .dat com cache de parse (ver _load_data_cached)."""
+    return _load_data_cached(filepath, os.path.getmtime(filepath), cache_dir)
+
+
+def _process_file_worker(filepath, methods, lambda1, lambda2, time_limit,
+                         solver_threads, cache_dir=None, parallel_methods=False):
+    """
+    Processa um ficheiro num processo worker.
+
+    O output é capturado num buffer e devolvido junto com o resultado,
+    para que os logs dos vários workers não fiquem misturados.
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = process_file(filepath, methods, lambda1, lambda2,
+                              time_limit, solver_threads, cache_dir,
+                              parallel_methods)
+    return result, buffer.getvalue()
+
+
+def _run_bb(data, lambda1, lambda2, time_limit, solver_threads):
+    """Executa o Branch & Bound puro e devolve as colunas bb_*."""
+    milp = PatientAllocationMILP(data, lambda1, lambda2)
+    milp.build_model()
+    bb_result = milp.solve(time_limit=time_limit, threads=solver_threads, verbose=False)
+
+    if bb_result:
+        print(f"  ✓ Tempo: {bb_result['solve_time']:.2f}s | Obj: {bb_result['objective_value']:.2f}")
+        return {
+            'bb_time': bb_result['solve_time'],
+            'bb_objective': bb_result['objective_value'],
+            'bb_gap': bb_result['gap'] if bb_result['gap'] else 0,
+            'bb_status': 'optimal',
+        }
+
+    print(f"  ⚠️ Timeout")
+    return {'bb_time': time_limit, 'bb_objective': None, 'bb_status': 'timeout'}
+
+
+def _run_sa(data, lambda1, lambda2, time_limit, solver_threads):
+    """Executa o Simulated Annealing e devolve as colunas sa_*."""
+    sa = SimulatedAnnealing(data, lambda1, lambda2)
+    sa_result = sa.solve(max_iterations=10000, verbose=False)
+
+    print(f"  ✓ Tempo: {sa_result['solve_time']:.2f}s | Obj: {sa_result['objective_value']:.2f}")
+    return {
+        'sa_time': sa_result['solve_time'],
+        'sa_objective': sa_result['objective_value'],
+        'sa_feasible': sa_result['feasible'],
+    }
+
+
+def _run_tabu(data, lambda1, lambda2, time_limit, solver_threads):
+    """Executa o Tabu Search e devolve as colunas tabu_*."""
+    ts = TabuSearch(data, lambda1, lambda2)
+    ts_result = ts.solve(max_iterations=5000, verbose=False)
+
+    print(f"  ✓ Tempo: {ts_result['solve_time']:.2f}s | Obj: {ts_result['objective_value']:.2f}")
+    return {
+        'tabu_time': ts_result['solve_time'],
+        'tabu_objective': ts_result['objective_value'],
+        'tabu_feasible': ts_result['feasible'],
+    }
+
+
+def _run_hybrid(data, lambda1, lambda2, time_limit, solver_threads):
+    """Executa o método híbrido (SA + B&B) e devolve as colunas hybrid_*."""
+    hybrid = HybridSolver(data, lambda1, lambda2)
+    hybrid_result = hybrid.solve(
+        metaheuristic='SA',
+        mh_max_iter=5000,
+        milp_time_limit=time_limit,
+        threads=solver_threads,
+        verbose=False
+    )
+
+    print(f"  ✓ Tempo: {hybrid_result['total_time']:.2f}s | Obj: {hybrid_result['final_obj']:.2f}")
+    return {
+        'hybrid_time': hybrid_result['total_time'],
+        'hybrid_objective': hybrid_result['final_obj'],
+        'hybrid_mh_obj': hybrid_result['metaheuristic_obj'],
+        'hybrid_improvement': hybrid_result['improvement_pct'],
+    }
+
+
+# Registo método → (função, prefixo das colunas, nome para o log).
+# Evita os quatro blocos if/try quase iguais em process_file e permite
+# lançar os métodos de forma uniforme (e.g. em paralelo).
+METHOD_REGISTRY = {
+    'bb': (_run_bb, 'bb', 'Branch & Bound'),
+    'sa': (_run_sa, 'sa', 'Simulated Annealing'),
+    'tabu': (_run_tabu, 'tabu', 'Tabu Search'),
+    'hybrid': (_run_hybrid, 'hybrid', 'Híbrido (SA + B&B)'),
+}
+
+
+def process_file(filepath, methods=['bb', 'sa', 'tabu', 'hybrid'],
+                 lambda1=0.5, lambda2=0.5, time_limit=300, solver_threads=4,
+                 cache_dir=None, parallel_methods=False):
+    """
+    Processa um único ficheiro com os métodos selecionados.
+
+    Função de módulo (não método) para poder ser enviada a processos
+    worker via pickle.
+
+    Args:
+        filepath: Caminho para o ficheiro .dat
+        methods: Lista de métodos a executar
+        lambda1: Peso objetivo 1
+        lambda2: Peso objetivo 2
+        time_limit: Tempo limite por método
+        solver_threads: Threads do Gurobi por método
+
+    Returns:
+        Dict com resultados de todos os métodos
+    """
+    filename = os.path.basename(filepath)
+    print(f"\n{'='*80}")
+    print(f"Processando: {filename}")
+    print(f"{'='*80}")
+
+    # Carregar dados (com cache de parse, se configurada)
+    try:
+        data = load_data(filepath, cache_dir)
+    except Exception as e:
+        print(f"❌ Erro ao carregar {filename}: {e}")
+        return None
+
+    result = {
+        'filename': filename,
+        'num_patients': len(data.patients),
+        'num_wards': len(data.wards),
+        'num_days': data.num_days,
+        'M': data.M  # Número de especializações menores
+    }
+
+    selected = [m for m in methods if m in METHOD_REGISTRY]
+    for method in methods:
+        if method not in METHOD_REGISTRY:
+            print(f"⚠️ Método desconhecido: {method}")
+
+    if parallel_methods and len(selected) > 1:
+        # Os métodos são independentes e passam a maior parte do tempo em
+        # código C (Gurobi/NumPy) que liberta o GIL: lançá-los em threads
+        # limita o tempo por ficheiro ao método mais lento, não à soma.
+        # Dividir as threads do Gurobi pelos métodos em curso.
+        threads_per_method = max(1, solver_threads // len(selected))
+        with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+            futures = {
+                executor.submit(METHOD_REGISTRY[m][0], data, lambda1, lambda2,
+                                time_limit, threads_per_method): m
+                for m in selected
+            }
+            for future in as_completed(futures):
+                method = futures[future]
+                _, prefix, label = METHOD_REGISTRY[method]
+                try:
+                    result.update(future.result())
+                    print(f"🔹 {label}: concluído")
+                except Exception as e:
+                    print(f"  ❌ Erro ({label}): {e}")
+                    result[f'{prefix}_time'] = None
+                    result[f'{prefix}_objective'] = None
+                    result[f'{prefix}_status'] = 'error'
+                    if prefix in ('sa', 'tabu'):
+                        result[f'{prefix}_feasible'] = False
+    else:
+        # Executar cada método via registo (tratamento de erros partilhado)
+        for method in selected:
+            run_method, prefix, label = METHOD_REGISTRY[method]
+            print(f"\n🔹 {label}...")
+            try:
+                result.update(run_method(data, lambda1, lambda2, time_limit, solver_threads))
+            except Exception as e:
+                print(f"  ❌ Erro: {e}")
+                result[f'{prefix}_time'] = None
+                result[f'{prefix}_objective'] = None
+                result[f'{prefix}_status'] = 'error'
+                if prefix in ('sa', 'tabu'):
+                    result[f'{prefix}_feasible'] = False
+
+    # Nota: os desvios em relação ao ótimo são calculados de forma
+    # vetorizada em generate_reports, sobre o DataFrame completo
+
+    return result
+
+
 class BatchAnalyzer:
     """Processa múltiplos ficheiros .dat e agrega resultados."""
     
@@ -29,7 +290,15 @@ class BatchAnalyzer:
         """
         self.data_dir = data_directory
         self.output_dir = output_directory
-        self.results = []
+        self.num_results = 0
+
+        # Caminhos de output calculados uma única vez
+        self.csv_path = os.path.join(self.output_dir, 'batch_results.csv')
+        self.manifest_path = os.path.join(self.output_dir, 'manifest.json')
+        self.cache_dir = os.path.join(self.output_dir, '_cache')
+        self.report_path = os.path.join(self.output_dir, 'batch_report.txt')
+        self.comparison_png = os.path.join(self.output_dir, 'batch_comparison.png')
+        self.scalability_png = os.path.join(self.output_dir, 'scalability.png')
         
         # Criar diretório de outputs se não existir
         os.makedirs(self.output_dir, exist_ok=True)
@@ -45,199 +314,209 @@ class BatchAnalyzer:
         Returns:
             Lista de caminhos dos ficheiros
         """
-        search_pattern = os.path.join(self.data_dir, pattern)
-        files = sorted(glob.glob(search_pattern))
-        
-        if max_files:
-            files = files[:max_files]
-        
+        # os.scandir evita um stat() por entrada (ao contrário de glob);
+        # compilar o padrão uma vez evita re-traduzi-lo em cada entrada
+        rx = re.compile(fnmatch.translate(pattern))
+        with os.scandir(self.data_dir) as entries:
+            matches = (
+                os.path.join(self.data_dir, entry.name)
+                for entry in entries
+                if entry.is_file() and rx.match(entry.name)
+            )
+            if max_files:
+                # Ordenação parcial: só os max_files primeiros interessam,
+                # sem materializar e ordenar o diretório inteiro
+                files = heapq.nsmallest(max_files, matches)
+            else:
+                files = sorted(matches)
+
         print(f"📂 Encontrados {len(files)} ficheiros .dat")
         return files
     
+    @staticmethod
+    def _save_manifest(path, files, completed, config=None):
+        """Reescreve o manifest de forma atómica (temp + os.replace)."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': files, 'completed': sorted(completed),
+                       'config': config}, f, indent=2)
+        os.replace(tmp_path, path)
+
     def process_single_file(self, filepath, methods=['bb', 'sa', 'tabu', 'hybrid'],
                            lambda1=0.5, lambda2=0.5, time_limit=300):
         """
         Processa um único ficheiro com os métodos selecionados.
-        
+
+        Mantido por compatibilidade: delega na função de módulo process_file.
+
         Args:
             filepath: Caminho para o ficheiro .dat
             methods: Lista de métodos a executar
             lambda1: Peso objetivo 1
             lambda2: Peso objetivo 2
             time_limit: Tempo limite por método
-        
+
         Returns:
             Dict com resultados de todos os métodos
         """
-        filename = os.path.basename(filepath)
-        print(f"\n{'='*80}")
-        print(f"Processando: {filename}")
-        print(f"{'='*80}")
-        
-        # Carregar dados
-        try:
-            data = PatientAllocationData(filepath)
-        except Exception as e:
-            print(f"❌ Erro ao carregar {filename}: {e}")
-            return None
-        
-        result = {
-            'filename': filename,
-            'num_patients': len(data.patients),
-            'num_wards': len(data.wards),
-            'num_days': data.num_days,
-            'M': data.M  # Número de especializações menores
-        }
-        
-        # Método 1: Branch & Bound
-        if 'bb' in methods:
-            print(f"\n🔹 Branch & Bound...")
-            try:
-                milp = PatientAllocationMILP(data, lambda1, lambda2)
-                milp.build_model()
-                bb_result = milp.solve(time_limit=time_limit, threads=4, verbose=False)
-                
-                if bb_result:
-                    result['bb_time'] = bb_result['solve_time']
-                    result['bb_objective'] = bb_result['objective_value']
-                    result['bb_gap'] = bb_result['gap'] if bb_result['gap'] else 0
-                    result['bb_status'] = 'optimal'
-                    print(f"  ✓ Tempo: {bb_result['solve_time']:.2f}s | Obj: {bb_result['objective_value']:.2f}")
-                else:
-                    result['bb_time'] = time_limit
-                    result['bb_objective'] = None
-                    result['bb_status'] = 'timeout'
-                    print(f"  ⚠️ Timeout")
-            except Exception as e:
-                print(f"  ❌ Erro: {e}")
-                result['bb_time'] = None
-                result['bb_objective'] = None
-                result['bb_status'] = 'error'
-        
-        # Método 2: Simulated Annealing
-        if 'sa' in methods:
-            print(f"\n🔹 Simulated Annealing...")
-            try:
-                sa = SimulatedAnnealing(data, lambda1, lambda2)
-                sa_result = sa.solve(max_iterations=10000, verbose=False)
-                
-                result['sa_time'] = sa_result['solve_time']
-                result['sa_objective'] = sa_result['objective_value']
-                result['sa_feasible'] = sa_result['feasible']
-                print(f"  ✓ Tempo: {sa_result['solve_time']:.2f}s | Obj: {sa_result['objective_value']:.2f}")
-            except Exception as e:
-                print(f"  ❌ Erro: {e}")
-                result['sa_time'] = None
-                result['sa_objective'] = None
-                result['sa_feasible'] = False
-        
-        # Método 3: Tabu Search
-        if 'tabu' in methods:
-            print(f"\n🔹 Tabu Search...")
-            try:
-                ts = TabuSearch(data, lambda1, lambda2)
-                ts_result = ts.solve(max_iterations=5000, verbose=False)
-                
-                result['tabu_time'] = ts_result['solve_time']
-                result['tabu_objective'] = ts_result['objective_value']
-                result['tabu_feasible'] = ts_result['feasible']
-                print(f"  ✓ Tempo: {ts_result['solve_time']:.2f}s | Obj: {ts_result['objective_value']:.2f}")
-            except Exception as e:
-                print(f"  ❌ Erro: {e}")
-                result['tabu_time'] = None
-                result['tabu_objective'] = None
-                result['tabu_feasible'] = False
-        
-        # Método 4: Híbrido
-        if 'hybrid' in methods:
-            print(f"\n🔹 Híbrido (SA + B&B)...")
-            try:
-                hybrid = HybridSolver(data, lambda1, lambda2)
-                hybrid_result = hybrid.solve(
-                    metaheuristic='SA',
-                    mh_max_iter=5000,
-                    milp_time_limit=time_limit,
-                    verbose=False
-                )
-                
-                result['hybrid_time'] = hybrid_result['total_time']
-                result['hybrid_objective'] = hybrid_result['final_obj']
-                result['hybrid_mh_obj'] = hybrid_result['metaheuristic_obj']
-                result['hybrid_improvement'] = hybrid_result['improvement_pct']
-                print(f"  ✓ Tempo: {hybrid_result['total_time']:.2f}s | Obj: {hybrid_result['final_obj']:.2f}")
-            except Exception as e:
-                print(f"  ❌ Erro: {e}")
-                result['hybrid_time'] = None
-                result['hybrid_objective'] = None
-        
-        # Calcular desvios em relação ao ótimo (se disponível)
-        if 'bb_objective' in result and result['bb_objective']:
-            optimal = result['bb_objective']
-            
-            if 'sa_objective' in result and result['sa_objective']:
-                result['sa_deviation'] = ((result['sa_objective'] - optimal) / optimal) * 100
-            
-            if 'tabu_objective' in result and result['tabu_objective']:
-                result['tabu_deviation'] = ((result['tabu_objective'] - optimal) / optimal) * 100
-            
-            if 'hybrid_objective' in result and result['hybrid_objective']:
-                result['hybrid_deviation'] = ((result['hybrid_objective'] - optimal) / optimal) * 100
-        
-        return result
-    
-    def run_batch_analysis(self, pattern='*.dat', max_files=None, 
+        return process_file(filepath, methods, lambda1, lambda2, time_limit)
+
+    def run_batch_analysis(self, pattern='*.dat', max_files=None,
                           methods=['bb', 'sa', 'hybrid'],
-                          lambda1=0.5, lambda2=0.5, time_limit=300):
+                          lambda1=0.5, lambda2=0.5, time_limit=300,
+                          n_workers=None, parallel_methods=False):
         """
         Executa análise em batch em múltiplos ficheiros.
-        
+
+        Os ficheiros são independentes entre si, por isso são processados
+        em paralelo num pool de processos (um ficheiro por worker).
+
         Args:
             pattern: Padrão de ficheiros a processar
             max_files: Número máximo de ficheiros (None = todos)
             methods: Métodos a executar
             lambda1, lambda2: Pesos dos objetivos
             time_limit: Tempo limite por método
+            n_workers: Número de processos paralelos (None = automático,
+                       1 = sequencial como antes)
+            parallel_methods: Se True, os métodos de cada ficheiro correm
+                              em threads concorrentes (ver process_file)
         """
         print("="*80)
         print("ANÁLISE EM BATCH - MÚLTIPLOS FICHEIROS")
         print("="*80)
-        
+
         # Encontrar ficheiros
         files = self.find_dat_files(pattern, max_files)
-        
+
         if not files:
             print("❌ Nenhum ficheiro encontrado!")
             return
-        
+
+        # Dimensionar o pool: reduzir as threads do Gurobi por worker para
+        # não sobre-subscrever os cores (workers × threads <= cpu_count)
+        if n_workers is None:
+            n_workers = min(len(files), max(1, os.cpu_count() // 2))
+        solver_threads = max(1, os.cpu_count() // n_workers) if n_workers > 1 else 4
+
         print(f"\n📊 Métodos selecionados: {methods}")
         print(f"⏱️  Tempo limite por método: {time_limit}s")
         print(f"📈 Pesos: λ1={lambda1}, λ2={lambda2}")
-        
-        # Processar cada ficheiro
+        print(f"⚙️  Workers: {n_workers} (threads Gurobi por worker: {solver_threads})")
+
+        # Processar cada ficheiro, escrevendo cada resultado imediatamente
+        # no CSV (append + flush): se o batch falhar a meio, os resultados
+        # já processados não se perdem e a memória não cresce com N ficheiros
         start_time = time.time()
-        
-        for i, filepath in enumerate(files, 1):
-            print(f"\n{'#'*80}")
-            print(f"# Ficheiro {i}/{len(files)}")
-            print(f"{'#'*80}")
-            
-            result = self.process_single_file(
-                filepath, 
-                methods=methods,
-                lambda1=lambda1,
-                lambda2=lambda2,
-                time_limit=time_limit
-            )
-            
-            if result:
-                self.results.append(result)
-        
+        self.num_results = 0
+        cache_dir = self.cache_dir
+
+        # Aquecer o cache JIT do Numba (metaheuristics usa @njit(cache=True)):
+        # compilar uma vez aqui evita que cada worker pague a compilação
+        if 'sa' in methods or 'tabu' in methods or 'hybrid' in methods:
+            try:
+                warm_data = load_data(files[0], cache_dir)
+                sa = SimulatedAnnealing(warm_data, lambda1, lambda2)
+                sa.solve(max_iterations=1, verbose=False)
+            except Exception as e:
+                print(f"⚠️ Warm-up do JIT falhou (ignorado): {e}")
+
+        # Manifest de resumabilidade: ficheiros já concluídos em runs
+        # anteriores (interrompidos ou não) são saltados
+        csv_path = self.csv_path
+        manifest_path = self.manifest_path
+        # Resultados só são reutilizáveis se a configuração que os gerou
+        # for a mesma: mudar métodos/pesos/limite invalida o manifest
+        config = {'methods': sorted(methods), 'lambda1': lambda1,
+                  'lambda2': lambda2, 'time_limit': time_limit}
+        completed = set()
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if manifest.get('config') == config:
+                    completed = set(manifest.get('completed', []))
+                else:
+                    print("⚠ Configuração diferente da do batch anterior - "
+                          "a recomeçar do zero")
+            except (ValueError, OSError):
+                completed = set()
+        completed &= set(files)
+        # Sem o CSV as linhas dos ficheiros "concluídos" já não existem:
+        # descartar o manifest (apagar o CSV força um run do zero)
+        if not os.path.exists(csv_path):
+            completed = set()
+        pending = [fp for fp in files if fp not in completed]
+
+        resume = bool(completed)
+        if resume:
+            print(f"🔁 A retomar batch: {len(completed)} ficheiros já "
+                  f"processados, {len(pending)} por processar")
+            self.num_results = len(completed)
+
+        self._save_manifest(manifest_path, files, completed, config)
+
+        with open(csv_path, 'a' if resume else 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=RESULT_COLUMNS,
+                                    extrasaction='ignore', restval='')
+            if not resume:
+                writer.writeheader()
+
+            def _record(filepath, result):
+                """Escreve o resultado no CSV e marca o ficheiro no manifest."""
+                writer.writerow(result)
+                csv_file.flush()
+                self.num_results += 1
+                completed.add(filepath)
+                self._save_manifest(manifest_path, files, completed, config)
+
+            if n_workers == 1:
+                # Modo sequencial (útil para debug)
+                for i, filepath in enumerate(pending, 1):
+                    print(f"\n{'#'*80}")
+                    print(f"# Ficheiro {i}/{len(pending)}")
+                    print(f"{'#'*80}")
+
+                    result = process_file(filepath, methods, lambda1, lambda2,
+                                          time_limit, solver_threads, cache_dir,
+                                          parallel_methods)
+
+                    if result:
+                        _record(filepath, result)
+            else:
+                # Modo paralelo: um ficheiro por worker
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    futures = {
+                        executor.submit(_process_file_worker, filepath, methods,
+                                        lambda1, lambda2, time_limit, solver_threads,
+                                        cache_dir, parallel_methods): filepath
+                        for filepath in pending
+                    }
+
+                    done = 0
+                    for future in as_completed(futures):
+                        filepath = futures[future]
+                        done += 1
+                        print(f"\n{'#'*80}")
+                        print(f"# Ficheiro {done}/{len(pending)} concluído")
+                        print(f"{'#'*80}")
+
+                        try:
+                            result, output = future.result()
+                            print(output, end='')
+                        except Exception as e:
+                            print(f"❌ Erro no worker ({filepath}): {e}")
+                            continue
+
+                        if result:
+                            _record(filepath, result)
+
         total_time = time.time() - start_time
-        
+
         print("\n" + "="*80)
         print("✓ ANÁLISE EM BATCH CONCLUÍDA!")
         print("="*80)
-        print(f"Ficheiros processados: {len(self.results)}/{len(files)}")
+        print(f"Ficheiros processados: {self.num_results}/{len(files)}")
         print(f"Tempo total: {total_time:.2f}s ({total_time/60:.1f} minutos)")
         print(f"Tempo médio por ficheiro: {total_time/len(files):.2f}s")
         
@@ -246,121 +525,151 @@ class BatchAnalyzer:
     
     def generate_reports(self):
         """Gera relatórios e visualizações dos resultados agregados."""
-        if not self.results:
+        if not self.num_results:
             print("❌ Sem resultados para gerar relatórios!")
             return
-        
+
         print("\n📊 Gerando relatórios...")
-        
-        # Converter para DataFrame
-        df = pd.DataFrame(self.results)
-        
-        # Salvar CSV
-        csv_path = os.path.join(self.output_dir, 'batch_results.csv')
-        df.to_csv(csv_path, index=False)
+
+        # Ler de volta o CSV escrito incrementalmente durante o batch
+        df = pd.read_csv(self.csv_path, dtype=RESULT_DTYPES)
         print(f"  ✓ CSV salvo: batch_results.csv")
-        
+
+        # Calcular os desvios em relação ao ótimo para todos os métodos
+        # e ficheiros de uma só vez (em vez de if-chains linha a linha)
+        if 'bb_objective' in df.columns:
+            obj_cols = ['sa_objective', 'tabu_objective', 'hybrid_objective']
+            dev_cols = ['sa_deviation', 'tabu_deviation', 'hybrid_deviation']
+            df[dev_cols] = (df[obj_cols].sub(df['bb_objective'], axis=0)
+                            .div(df['bb_objective'], axis=0) * 100).values
+
+        # Descobrir os métodos presentes e agregar as métricas UMA vez,
+        # partilhando o resultado entre estatísticas e relatório textual
+        methods = self._discover_methods(df)
+        summary = self._compute_summary(df)
+
         # Gerar estatísticas
-        self._generate_statistics(df)
-        
+        self._generate_statistics(methods, summary)
+
         # Gerar visualizações
         self._generate_visualizations(df)
-        
+
         # Gerar relatório textual
-        self._generate_text_report(df)
-    
-    def _generate_statistics(self, df):
-        """Calcula e exibe estatísticas agregadas."""
+        self._generate_text_report(df, methods, summary)
+
+    # Nomes legíveis dos métodos, na ordem canónica dos relatórios
+    METHOD_LABELS = [
+        ('Branch & Bound', 'bb'),
+        ('Simulated Annealing', 'sa'),
+        ('Tabu Search', 'tabu'),
+        ('Híbrido', 'hybrid'),
+    ]
+
+    @classmethod
+    def _discover_methods(cls, df):
+        """Lista (nome, prefixo) dos métodos com resultados no DataFrame."""
+        return [
+            (name, prefix) for name, prefix in cls.METHOD_LABELS
+            if f'{prefix}_time' in df.columns and df[f'{prefix}_time'].notna().any()
+        ]
+
+    @staticmethod
+    def _compute_summary(df):
+        """
+        Agrega todas as métricas numa única passagem (NaN ignorados).
+
+        Devolve um DataFrame (estatística × coluna) usado tanto por
+        _generate_statistics como por _generate_text_report, que passam
+        a ser puros formatadores sem mais reduções pandas.
+        """
+        metrics = df.filter(regex='_(time|objective|deviation)$')
+        summary = metrics.agg(['mean', 'std', 'min', 'max', 'median', 'count'])
+        # Nº de instâncias em que a metaheurística atingiu o ótimo
+        summary.loc['n_optimal'] = (metrics == 0).sum()
+        return summary
+
+    def _generate_statistics(self, methods, stats):
+        """Exibe as estatísticas agregadas pré-calculadas."""
         print("\n" + "="*80)
         print("ESTATÍSTICAS AGREGADAS")
         print("="*80)
-        
-        # Estatísticas por método
-        methods = []
-        if 'bb_time' in df.columns:
-            methods.append(('Branch & Bound', 'bb'))
-        if 'sa_time' in df.columns:
-            methods.append(('Simulated Annealing', 'sa'))
-        if 'tabu_time' in df.columns:
-            methods.append(('Tabu Search', 'tabu'))
-        if 'hybrid_time' in df.columns:
-            methods.append(('Híbrido', 'hybrid'))
-        
+
         for method_name, prefix in methods:
             print(f"\n{method_name}:")
             print("-" * 60)
-            
+
             time_col = f'{prefix}_time'
             obj_col = f'{prefix}_objective'
-            
-            if time_col in df.columns:
-                times = df[time_col].dropna()
-                if len(times) > 0:
-                    print(f"  Tempo médio: {times.mean():.2f}s (±{times.std():.2f}s)")
-                    print(f"  Tempo min/max: {times.min():.2f}s / {times.max():.2f}s")
-            
-            if obj_col in df.columns:
-                objs = df[obj_col].dropna()
-                if len(objs) > 0:
-                    print(f"  Objetivo médio: {objs.mean():.2f} (±{objs.std():.2f})")
-            
-            # Desvio do ótimo (se aplicável)
             dev_col = f'{prefix}_deviation'
-            if dev_col in df.columns:
-                devs = df[dev_col].dropna()
-                if len(devs) > 0:
-                    print(f"  Desvio médio do ótimo: {devs.mean():.2f}% (±{devs.std():.2f}%)")
-                    print(f"  Desvio min/max: {devs.min():.2f}% / {devs.max():.2f}%")
+
+            if time_col in stats.columns and stats.at['count', time_col] > 0:
+                s = stats[time_col]
+                print(f"  Tempo médio: {s['mean']:.2f}s (±{s['std']:.2f}s)")
+                print(f"  Tempo min/max: {s['min']:.2f}s / {s['max']:.2f}s")
+
+            if obj_col in stats.columns and stats.at['count', obj_col] > 0:
+                s = stats[obj_col]
+                print(f"  Objetivo médio: {s['mean']:.2f} (±{s['std']:.2f})")
+
+            # Desvio do ótimo (se aplicável)
+            if dev_col in stats.columns and stats.at['count', dev_col] > 0:
+                s = stats[dev_col]
+                print(f"  Desvio médio do ótimo: {s['mean']:.2f}% (±{s['std']:.2f}%)")
+                print(f"  Desvio min/max: {s['min']:.2f}% / {s['max']:.2f}%")
     
+    @staticmethod
+    def _box_stats(series, label):
+        """
+        Pré-calcula as estatísticas de um boxplot com numpy.
+
+        Devolve o dict esperado por Axes.bxp (ou None se não há dados),
+        para que o matplotlib apenas desenhe primitivas em vez de
+        recalcular os quantis internamente.
+        """
+        values = series.dropna().to_numpy()
+        if values.size == 0:
+            return None
+        lo, q1, med, q3, hi = np.percentile(values, [0, 25, 50, 75, 100])
+        return {'label': label, 'med': med, 'q1': q1, 'q3': q3,
+                'whislo': lo, 'whishi': hi, 'fliers': []}
+
     def _generate_visualizations(self, df):
         """Gera gráficos comparativos."""
         print("\n📊 Gerando visualizações...")
-        
-        # Gráfico 1: Boxplot de tempos
+
+        # Gráfico 1: Boxplots de tempos e desvios (estatísticas pré-reduzidas)
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-        
+
         # Tempos
-        time_data = []
-        time_labels = []
-        
-        if 'bb_time' in df.columns:
-            time_data.append(df['bb_time'].dropna())
-            time_labels.append('B&B')
-        if 'sa_time' in df.columns:
-            time_data.append(df['sa_time'].dropna())
-            time_labels.append('SA')
-        if 'tabu_time' in df.columns:
-            time_data.append(df['tabu_time'].dropna())
-            time_labels.append('Tabu')
-        if 'hybrid_time' in df.columns:
-            time_data.append(df['hybrid_time'].dropna())
-            time_labels.append('Híbrido')
-        
+        time_stats = [
+            s for s in (
+                self._box_stats(df['bb_time'], 'B&B') if 'bb_time' in df.columns else None,
+                self._box_stats(df['sa_time'], 'SA') if 'sa_time' in df.columns else None,
+                self._box_stats(df['tabu_time'], 'Tabu') if 'tabu_time' in df.columns else None,
+                self._box_stats(df['hybrid_time'], 'Híbrido') if 'hybrid_time' in df.columns else None,
+            ) if s is not None
+        ]
+
         ax1 = axes[0]
-        bp1 = ax1.boxplot(time_data, labels=time_labels, patch_artist=True)
+        bp1 = ax1.bxp(time_stats, patch_artist=True)
         for patch in bp1['boxes']:
             patch.set_facecolor('lightblue')
         ax1.set_ylabel('Tempo (segundos)', fontweight='bold')
         ax1.set_title('Distribuição dos Tempos de Execução', fontweight='bold')
         ax1.grid(axis='y', alpha=0.3)
-        
+
         # Desvios do ótimo
-        if 'sa_deviation' in df.columns or 'tabu_deviation' in df.columns:
-            dev_data = []
-            dev_labels = []
-            
-            if 'sa_deviation' in df.columns:
-                dev_data.append(df['sa_deviation'].dropna())
-                dev_labels.append('SA')
-            if 'tabu_deviation' in df.columns:
-                dev_data.append(df['tabu_deviation'].dropna())
-                dev_labels.append('Tabu')
-            if 'hybrid_deviation' in df.columns:
-                dev_data.append(df['hybrid_deviation'].dropna())
-                dev_labels.append('Híbrido')
-            
+        dev_stats = [
+            s for s in (
+                self._box_stats(df['sa_deviation'], 'SA') if 'sa_deviation' in df.columns else None,
+                self._box_stats(df['tabu_deviation'], 'Tabu') if 'tabu_deviation' in df.columns else None,
+                self._box_stats(df['hybrid_deviation'], 'Híbrido') if 'hybrid_deviation' in df.columns else None,
+            ) if s is not None
+        ]
+
+        if dev_stats:
             ax2 = axes[1]
-            bp2 = ax2.boxplot(dev_data, labels=dev_labels, patch_artist=True)
+            bp2 = ax2.bxp(dev_stats, patch_artist=True)
             for patch in bp2['boxes']:
                 patch.set_facecolor('lightcoral')
             ax2.set_ylabel('Desvio do Ótimo (%)', fontweight='bold')
@@ -368,86 +677,72 @@ class BatchAnalyzer:
             ax2.axhline(y=0, color='green', linestyle='--', linewidth=2, label='Ótimo')
             ax2.legend()
             ax2.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(self.output_dir, 'batch_comparison.png'), dpi=150)
+
+        fig.tight_layout()
+        fig.savefig(self.comparison_png, dpi=150)
         print(f"  ✓ Gráfico salvo: batch_comparison.png")
-        plt.close()
-        
+
         # Gráfico 2: Scatter plot tamanho do problema vs tempo
+        # (reutilizar a mesma figura em vez de criar uma nova)
         if 'bb_time' in df.columns and 'hybrid_time' in df.columns:
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            ax.scatter(df['num_patients'], df['bb_time'], 
+            fig.clear()
+            fig.set_size_inches(10, 6)
+            ax = fig.add_subplot(111)
+
+            ax.scatter(df['num_patients'], df['bb_time'],
                       label='Branch & Bound', alpha=0.6, s=50)
-            ax.scatter(df['num_patients'], df['hybrid_time'], 
+            ax.scatter(df['num_patients'], df['hybrid_time'],
                       label='Híbrido', alpha=0.6, s=50)
-            
+
             ax.set_xlabel('Número de Pacientes', fontweight='bold')
             ax.set_ylabel('Tempo (segundos)', fontweight='bold')
             ax.set_title('Escalabilidade: Tempo vs Tamanho do Problema', fontweight='bold')
             ax.legend()
             ax.grid(alpha=0.3)
-            
-            plt.tight_layout()
-            plt.savefig(os.path.join(self.output_dir, 'scalability.png'), dpi=150)
+
+            fig.tight_layout()
+            fig.savefig(self.scalability_png, dpi=150)
             print(f"  ✓ Gráfico salvo: scalability.png")
-            plt.close()
+
+        plt.close(fig)
     
-    def _generate_text_report(self, df):
-        """Gera relatório textual detalhado."""
-        report_path = os.path.join(self.output_dir, 'batch_report.txt')
-        
-        with open(report_path, 'w', encoding='utf-8') as f:
+    def _generate_text_report(self, df, methods, stats):
+        """Gera relatório textual detalhado a partir do resumo pré-calculado."""
+        with open(self.report_path, 'w', encoding='utf-8') as f:
             f.write("="*80 + "\n")
             f.write("RELATÓRIO DE ANÁLISE EM BATCH\n")
             f.write("="*80 + "\n\n")
-            
+
             f.write(f"Número de instâncias processadas: {len(df)}\n")
-            f.write(f"Métodos testados: {[col.replace('_time', '') for col in df.columns if '_time' in col]}\n\n")
-            
+            f.write(f"Métodos testados: {[prefix for _, prefix in methods]}\n\n")
+
             f.write("ESTATÍSTICAS AGREGADAS\n")
             f.write("-" * 80 + "\n\n")
-            
-            # Resumo por método
-            methods = []
-            if 'bb_time' in df.columns:
-                methods.append(('Branch & Bound', 'bb'))
-            if 'sa_time' in df.columns:
-                methods.append(('Simulated Annealing', 'sa'))
-            if 'tabu_time' in df.columns:
-                methods.append(('Tabu Search', 'tabu'))
-            if 'hybrid_time' in df.columns:
-                methods.append(('Híbrido', 'hybrid'))
-            
+
             for method_name, prefix in methods:
                 f.write(f"{method_name}:\n")
-                
+
                 time_col = f'{prefix}_time'
                 obj_col = f'{prefix}_objective'
                 dev_col = f'{prefix}_deviation'
-                
-                if time_col in df.columns:
-                    times = df[time_col].dropna()
-                    if len(times) > 0:
-                        f.write(f"  Tempo médio: {times.mean():.2f}s (±{times.std():.2f})\n")
-                        f.write(f"  Tempo mediano: {times.median():.2f}s\n")
-                
-                if obj_col in df.columns:
-                    objs = df[obj_col].dropna()
-                    if len(objs) > 0:
-                        f.write(f"  Objetivo médio: {objs.mean():.2f}\n")
-                
-                if dev_col in df.columns:
-                    devs = df[dev_col].dropna()
-                    if len(devs) > 0:
-                        f.write(f"  Desvio médio: {devs.mean():.2f}%\n")
-                        f.write(f"  Instâncias ótimas: {(devs == 0).sum()}/{len(devs)}\n")
-                
+
+                if time_col in stats.columns and stats.at['count', time_col] > 0:
+                    s = stats[time_col]
+                    f.write(f"  Tempo médio: {s['mean']:.2f}s (±{s['std']:.2f})\n")
+                    f.write(f"  Tempo mediano: {s['median']:.2f}s\n")
+
+                if obj_col in stats.columns and stats.at['count', obj_col] > 0:
+                    f.write(f"  Objetivo médio: {stats.at['mean', obj_col]:.2f}\n")
+
+                if dev_col in stats.columns and stats.at['count', dev_col] > 0:
+                    s = stats[dev_col]
+                    f.write(f"  Desvio médio: {s['mean']:.2f}%\n")
+                    f.write(f"  Instâncias ótimas: {int(s['n_optimal'])}/{int(s['count'])}\n")
+
                 f.write("\n")
-            
+
             f.write("="*80 + "\n")
-        
+
         print(f"  ✓ Relatório salvo: batch_report.txt")
 
 
@@ -2,6 +2,8 @@
 Script Simples: Verificar se Y são valores binários (0 ou 1)
 """
 
+import sys
+import numpy as np
 from data_parser import PatientAllocationData
 from milp_model import PatientAllocationMILP
 
@@ -41,23 +43,18 @@ print(f"   Total de variáveis Y: {len(model.y)}")
 
 print("\n📋 DEPOIS DE RESOLVER (valores atribuídos):")
 
-# Contar valores
-count_zero = 0
-count_one = 0
-count_other = 0
+# Obter todos os valores numa única chamada ao Gurobi (em vez de uma
+# chamada var.X por variável) e classificar com numpy
+keys = list(model.y.keys())
+values = np.asarray(model.model.getAttr('X', list(model.y.values())))
 
-y_values = []
+is_zero = np.abs(values) < 1e-6          # Essencialmente 0
+is_one = np.abs(values - 1) < 1e-6       # Essencialmente 1
+is_other = ~(is_zero | is_one)           # Nem 0 nem 1 (PROBLEMA!)
 
-for (p, w, d), var in model.y.items():
-    value = var.X  # Valor da variável na solução
-    y_values.append(((p, w, d), value))
-    
-    if abs(value - 0) < 1e-6:  # Essencialmente 0
-        count_zero += 1
-    elif abs(value - 1) < 1e-6:  # Essencialmente 1
-        count_one += 1
-    else:  # Nem 0 nem 1 (PROBLEMA!)
-        count_other += 1
+count_zero = int(is_zero.sum())
+count_one = int(is_one.sum())
+count_other = int(is_other.sum())
 
 print(f"\n📊 ESTATÍSTICAS:")
 print(f"   Total de variáveis Y: {len(model.y)}")
@@ -78,40 +75,44 @@ print("\n" + "="*80)
 print("VALORES EXATOS DE TODAS AS VARIÁVEIS Y")
 print("="*80)
 
-# Separar em Y=0 e Y=1
-y_zeros = [(k, v) for k, v in y_values if abs(v - 0) < 1e-6]
-y_ones = [(k, v) for k, v in y_values if abs(v - 1) < 1e-6]
-y_others = [(k, v) for k, v in y_values if abs(v - 0) >= 1e-6 and abs(v - 1) >= 1e-6]
+# Separar em Y=0 e Y=1 via índices numpy (sem voltar a comparar valor a valor)
+y_zeros = [(keys[i], values[i]) for i in np.where(is_zero)[0]]
+y_ones = [(keys[i], values[i]) for i in np.where(is_one)[0]]
+y_others = [(keys[i], values[i]) for i in np.where(is_other)[0]]
 
 print(f"\n1️⃣  VARIÁVEIS Y = 1 (paciente ALOCADO):")
 print(f"   Total: {len(y_ones)}")
 print(f"   (Estas representam as alocações escolhidas)")
 print()
 
-for (p, w, d), value in sorted(y_ones):
+# Construir o output num único buffer e escrever de uma só vez, em vez
+# de três print() (syscalls) por variável; a ordem de model.y é mantida
+lines = []
+for (p, w, d), value in y_ones:
     patient = data.patients[p]
-    print(f"   Y[{p}, {w}, dia{d}] = {value:.10f}")
-    print(f"      └─ Paciente {p} admitido em {w} no dia {d}")
-    print(f"      └─ Especialização: {patient['specialization']}, LOS: {patient['los']} dias")
+    lines.append(f"   Y[{p}, {w}, dia{d}] = {value:.10f}")
+    lines.append(f"      └─ Paciente {p} admitido em {w} no dia {d}")
+    lines.append(f"      └─ Especialização: {patient['specialization']}, LOS: {patient['los']} dias")
 
-print(f"\n2️⃣  VARIÁVEIS Y = 0 (paciente NÃO alocado nesta opção):")
-print(f"   Total: {len(y_zeros)}")
-print(f"   (Mostrando apenas as primeiras 20 para não poluir)")
-print()
+lines.append(f"\n2️⃣  VARIÁVEIS Y = 0 (paciente NÃO alocado nesta opção):")
+lines.append(f"   Total: {len(y_zeros)}")
+lines.append(f"   (Mostrando apenas as primeiras 20 para não poluir)")
+lines.append("")
 
-for (p, w, d), value in y_zeros[:20]:
-    print(f"   Y[{p}, {w}, dia{d}] = {value:.10f}")
+lines.extend(f"   Y[{p}, {w}, dia{d}] = {value:.10f}"
+             for (p, w, d), value in y_zeros[:20])
 
 if len(y_zeros) > 20:
-    print(f"   ... e mais {len(y_zeros) - 20} variáveis Y = 0")
+    lines.append(f"   ... e mais {len(y_zeros) - 20} variáveis Y = 0")
 
 if y_others:
-    print(f"\n3️⃣  VARIÁVEIS Y COM VALORES FRACIONÁRIOS (PROBLEMA!):")
-    print(f"   Total: {len(y_others)}")
-    print()
-    
-    for (p, w, d), value in y_others:
-        print(f"   ⚠️  Y[{p}, {w}, dia{d}] = {value:.10f}  ← NÃO É BINÁRIO!")
+    lines.append(f"\n3️⃣  VARIÁVEIS Y COM VALORES FRACIONÁRIOS (PROBLEMA!):")
+    lines.append(f"   Total: {len(y_others)}")
+    lines.append("")
+    lines.extend(f"   ⚠️  Y[{p}, {w}, dia{d}] = {value:.10f}  ← NÃO É BINÁRIO!"
+                 for (p, w, d), value in y_others)
+
+sys.stdout.write("\n".join(lines) + "\n")
 
 # Verificação final
 print("\n" + "="*80)
@@ -3,6 +3,9 @@ Parser para ler os ficheiros .dat do problema de alocação de pacientes.
 Este módulo processa os dados e organiza-os em estruturas Python facilmente utilizáveis.
 """
 
+import numpy as np
+
+
 class PatientAllocationData:
     """Classe para armazenar todos os dados do problema."""
     
@@ -74,7 +77,9 @@ class PatientAllocationData:
                     spec_line = lines[i + j].strip().split('\t')
                     spec_name = spec_line[0]
                     workload_factor = float(spec_line[1])
-                    ot_time = [int(x) for x in spec_line[2].split(';')]
+                    # Quantidades por dia ficam como arrays numpy: indexáveis
+                    # como as listas, mas fatiáveis e aceites pelos kernels
+                    ot_time = np.array(spec_line[2].split(';'), dtype=np.int64)
                     
                     self.specialisms[spec_name] = {
                         'workload_factor': workload_factor,
@@ -92,8 +97,8 @@ class PatientAllocationData:
                     workload_capacity = float(ward_line[2])
                     major_spec = ward_line[3]
                     minor_specs = ward_line[4].split(';') if ward_line[4] != 'NONE' else []
-                    carryover_patients = [int(x) for x in ward_line[5].split(';')]
-                    carryover_workload = [float(x) for x in ward_line[6].split(';')]
+                    carryover_patients = np.array(ward_line[5].split(';'), dtype=np.int64)
+                    carryover_workload = np.array(ward_line[6].split(';'), dtype=np.float64)
                     
                     self.wards[ward_name] = {
                         'bed_capacity': bed_capacity,
@@ -121,7 +126,7 @@ class PatientAllocationData:
                     latest = int(patient_line[3])
                     los = int(patient_line[4])  # Length of stay
                     surgery_duration = int(patient_line[5])
-                    workload = [float(x) for x in patient_line[6].split(';')]
+                    workload = np.array(patient_line[6].split(';'), dtype=np.float64)
                     
                     self.patients[patient_id] = {
                         'specialization': specialization,
@@ -135,6 +140,118 @@ class PatientAllocationData:
             
             i += 1
     
+    def to_npz(self, path):
+        """
+        Guarda os dados já parseados num ficheiro .npz (arrays numpy).
+
+        Útil para passar os dados a processos worker sem repetir o parse
+        do texto: o .npz carrega por mmap, sem custo de parsing.
+
+        Args:
+            path: Caminho do ficheiro .npz a criar
+        """
+        spec_names = list(self.specialisms.keys())
+        ward_names = list(self.wards.keys())
+        patient_ids = list(self.patients.keys())
+
+        max_workload_len = max(len(p['workload_per_day']) for p in self.patients.values())
+        patient_workload = np.zeros((len(patient_ids), max_workload_len))
+        workload_len = np.empty(len(patient_ids), dtype=np.int64)
+        for i, pid in enumerate(patient_ids):
+            wl = self.patients[pid]['workload_per_day']
+            workload_len[i] = len(wl)
+            patient_workload[i, :len(wl)] = wl
+
+        np.savez(
+            path,
+            filepath=np.array(self.filepath),
+            general=np.array([self.seed, self.M, self.num_days], dtype=np.int64),
+            weights=np.array([self.weight_overtime, self.weight_undertime,
+                              self.weight_delay]),
+            spec_names=np.array(spec_names),
+            spec_workload_factor=np.array(
+                [self.specialisms[s]['workload_factor'] for s in spec_names]),
+            spec_ot_time=np.array(
+                [self.specialisms[s]['ot_time'] for s in spec_names], dtype=np.int64),
+            ward_names=np.array(ward_names),
+            ward_bed_capacity=np.array(
+                [self.wards[w]['bed_capacity'] for w in ward_names], dtype=np.int64),
+            ward_workload_capacity=np.array(
+                [self.wards[w]['workload_capacity'] for w in ward_names]),
+            ward_major_spec=np.array(
+                [self.wards[w]['major_specialization'] for w in ward_names]),
+            ward_minor_specs=np.array(
+                [';'.join(self.wards[w]['minor_specializations']) for w in ward_names]),
+            ward_carryover_patients=np.array(
+                [self.wards[w]['carryover_patients'] for w in ward_names], dtype=np.int64),
+            ward_carryover_workload=np.array(
+                [self.wards[w]['carryover_workload'] for w in ward_names]),
+            patient_ids=np.array(patient_ids),
+            patient_spec=np.array(
+                [self.patients[p]['specialization'] for p in patient_ids]),
+            patient_window=np.array(
+                [[self.patients[p]['earliest'], self.patients[p]['latest'],
+                  self.patients[p]['los'], self.patients[p]['surgery_duration']]
+                 for p in patient_ids], dtype=np.int64),
+            patient_workload=patient_workload,
+            patient_workload_len=workload_len,
+        )
+
+    @classmethod
+    def from_npz(cls, path, mmap_mode='r'):
+        """
+        Carrega os dados a partir de um .npz criado por to_npz.
+
+        Args:
+            path: Caminho do ficheiro .npz
+            mmap_mode: Modo de mmap passado ao np.load (só leitura por defeito)
+
+        Returns:
+            Instância de PatientAllocationData equivalente à parseada do .dat
+        """
+        npz = np.load(path, mmap_mode=mmap_mode)
+
+        data = cls.__new__(cls)
+        data.filepath = str(npz['filepath'])
+        data.seed, data.M, data.num_days = (int(x) for x in npz['general'])
+        data.weight_overtime, data.weight_undertime, data.weight_delay = \
+            (float(x) for x in npz['weights'])
+
+        data.specialisms = {}
+        for i, name in enumerate(npz['spec_names']):
+            data.specialisms[str(name)] = {
+                'workload_factor': float(npz['spec_workload_factor'][i]),
+                'ot_time': np.array(npz['spec_ot_time'][i]),
+            }
+
+        data.wards = {}
+        for i, name in enumerate(npz['ward_names']):
+            minors = str(npz['ward_minor_specs'][i])
+            data.wards[str(name)] = {
+                'bed_capacity': int(npz['ward_bed_capacity'][i]),
+                'workload_capacity': float(npz['ward_workload_capacity'][i]),
+                'major_specialization': str(npz['ward_major_spec'][i]),
+                'minor_specializations': minors.split(';') if minors else [],
+                'carryover_patients': np.array(npz['ward_carryover_patients'][i]),
+                'carryover_workload': np.array(npz['ward_carryover_workload'][i]),
+            }
+
+        data.patients = {}
+        window = npz['patient_window']
+        workload = npz['patient_workload']
+        workload_len = npz['patient_workload_len']
+        for i, pid in enumerate(npz['patient_ids']):
+            data.patients[str(pid)] = {
+                'specialization': str(npz['patient_spec'][i]),
+                'earliest': int(window[i, 0]),
+                'latest': int(window[i, 1]),
+                'los': int(window[i, 2]),
+                'surgery_duration': int(window[i, 3]),
+                'workload_per_day': np.array(workload[i, :workload_len[i]]),
+            }
+
+        return data
+
     def print_summary(self):
         """Imprime um resumo dos dados carregados."""
         print("=" * 60)
@@ -3,28 +3,33 @@ Script principal para executar e comparar os 4 métodos de otimização.
 Inclui visualizações e geração de relatório.
 """
 
-import matplotlib.pyplot as plt
-import pandas as pd
 import numpy as np
 from data_parser import PatientAllocationData
-from milp_model import PatientAllocationMILP
-from metaheuristics import SimulatedAnnealing, TabuSearch
-from hybrid_solver import HybridSolver, compare_all_methods
 import time
 
+# Os imports pesados (matplotlib ~400ms, pandas, gurobipy via milp/hybrid)
+# são feitos dentro das funções que os usam, para não penalizar o arranque
+# de quem só quer as metaheurísticas ou o parser
 
-def run_complete_comparison(data_file, lambda1=0.5, lambda2=0.5, 
-                            time_limit=300, output_dir='/mnt/user-data/outputs'):
+
+def run_complete_comparison(data_file, lambda1=0.5, lambda2=0.5,
+                            time_limit=300, output_dir='/mnt/user-data/outputs',
+                            parallel=False):
     """
     Executa comparação completa dos 4 métodos e gera relatório com gráficos.
-    
+
     Args:
         data_file: Caminho para o ficheiro .dat
         lambda1: Peso do objetivo 1 (custo)
         lambda2: Peso do objetivo 2 (equilíbrio)
         time_limit: Tempo limite em segundos
         output_dir: Diretório para guardar os resultados
+        parallel: Se True, os 4 métodos correm em processos paralelos
     """
+    from milp_model import PatientAllocationMILP
+    from metaheuristics import SimulatedAnnealing, TabuSearch
+    from hybrid_solver import HybridSolver
+
     print("="*80)
     print("ANÁLISE COMPLETA: COMPARAÇÃO DOS 4 MÉTODOS")
     print("="*80)
@@ -45,15 +50,49 @@ def run_complete_comparison(data_file, lambda1=0.5, lambda2=0.5,
     print("="*80)
     
     results = {}
-    
-    # MÉTODO 1: Branch & Bound
-    print("\n🔹 MÉTODO 1: BRANCH & BOUND PURO")
-    print("-" * 80)
-    start = time.time()
-    milp = PatientAllocationMILP(data, lambda1, lambda2)
-    milp.build_model()
-    m1_result = milp.solve(time_limit=time_limit, threads=4, verbose=True)
-    
+
+    if parallel:
+        # Os 4 métodos são independentes: lançá-los em processos paralelos
+        # reduz o tempo de parede para ~o método mais lento
+        from hybrid_solver import run_methods_parallel
+        parallel_results = run_methods_parallel(
+            data_file, ['bb', 'sa', 'tabu', 'hybrid'],
+            lambda1, lambda2, time_limit, data=data)
+        m1_result = parallel_results.get('bb')
+        m2_result = parallel_results.get('sa')
+        m3_result = parallel_results.get('tabu')
+        m4_result = parallel_results.get('hybrid')
+    else:
+        # MÉTODO 1: Branch & Bound
+        print("\n🔹 MÉTODO 1: BRANCH & BOUND PURO")
+        print("-" * 80)
+        milp = PatientAllocationMILP(data, lambda1, lambda2)
+        milp.build_model()
+        m1_result = milp.solve(time_limit=time_limit, threads=4, verbose=True)
+
+        # MÉTODO 2: Simulated Annealing
+        print("\n🔹 MÉTODO 2: SIMULATED ANNEALING")
+        print("-" * 80)
+        sa = SimulatedAnnealing(data, lambda1, lambda2)
+        m2_result = sa.solve(max_iterations=10000, verbose=True)
+
+        # MÉTODO 3: Tabu Search
+        print("\n🔹 MÉTODO 3: TABU SEARCH")
+        print("-" * 80)
+        ts = TabuSearch(data, lambda1, lambda2)
+        m3_result = ts.solve(max_iterations=5000, verbose=True)
+
+        # MÉTODO 4: Híbrido
+        print("\n🔹 MÉTODO 4: HÍBRIDO (SA + B&B)")
+        print("-" * 80)
+        hybrid = HybridSolver(data, lambda1, lambda2)
+        m4_result = hybrid.solve(
+            metaheuristic='SA',
+            mh_max_iter=5000,
+            milp_time_limit=time_limit,
+            verbose=True
+        )
+
     if m1_result:
         results['Branch & Bound\n(Exato)'] = {
             'tempo': m1_result['solve_time'],
@@ -62,47 +101,26 @@ def run_complete_comparison(data_file, lambda1=0.5, lambda2=0.5,
             'tipo': 'Exato',
             'cor': '#2ecc71'
         }
-    
-    # MÉTODO 2: Simulated Annealing
-    print("\n🔹 MÉTODO 2: SIMULATED ANNEALING")
-    print("-" * 80)
-    sa = SimulatedAnnealing(data, lambda1, lambda2)
-    m2_result = sa.solve(max_iterations=10000, verbose=True)
-    
-    results['Simulated\nAnnealing'] = {
-        'tempo': m2_result['solve_time'],
-        'objetivo': m2_result['objective_value'],
-        'gap': None,
-        'tipo': 'Metaheurística',
-        'cor': '#e74c3c'
-    }
-    
-    # MÉTODO 3: Tabu Search
-    print("\n🔹 MÉTODO 3: TABU SEARCH")
-    print("-" * 80)
-    ts = TabuSearch(data, lambda1, lambda2)
-    m3_result = ts.solve(max_iterations=5000, verbose=True)
-    
-    results['Tabu\nSearch'] = {
-        'tempo': m3_result['solve_time'],
-        'objetivo': m3_result['objective_value'],
-        'gap': None,
-        'tipo': 'Metaheurística',
-        'cor': '#f39c12'
-    }
-    
-    # MÉTODO 4: Híbrido
-    print("\n🔹 MÉTODO 4: HÍBRIDO (SA + B&B)")
-    print("-" * 80)
-    hybrid = HybridSolver(data, lambda1, lambda2)
-    m4_result = hybrid.solve(
-        metaheuristic='SA',
-        mh_max_iter=5000,
-        milp_time_limit=time_limit,
-        verbose=True
-    )
-    
-    if m4_result['final_obj']:
+
+    if m2_result:
+        results['Simulated\nAnnealing'] = {
+            'tempo': m2_result['solve_time'],
+            'objetivo': m2_result['objective_value'],
+            'gap': None,
+            'tipo': 'Metaheurística',
+            'cor': '#e74c3c'
+        }
+
+    if m3_result:
+        results['Tabu\nSearch'] = {
+            'tempo': m3_result['solve_time'],
+            'objetivo': m3_result['objective_value'],
+            'gap': None,
+            'tipo': 'Metaheurística',
+            'cor': '#f39c12'
+        }
+
+    if m4_result and m4_result['final_obj']:
         results['Híbrido\n(SA + B&B)'] = {
             'tempo': m4_result['total_time'],
             'objetivo': m4_result['final_obj'],
@@ -126,64 +144,63 @@ def run_complete_comparison(data_file, lambda1=0.5, lambda2=0.5,
     print("  - comparison_chart.png")
     print("  - time_vs_quality.png")
     print("  - report.txt")
+    print("  - results.csv")
     print()
 
 
 def _create_visualizations(results, output_dir, num_days, num_patients):
     """Cria gráficos de comparação."""
-    
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-    
+    import matplotlib
+    matplotlib.use('Agg')  # Backend headless: não precisa de display
+    import matplotlib.pyplot as plt
+
+    # Uma única figura reutilizada para os dois PNGs (fig.clear() entre
+    # eles), sem bbox_inches='tight' que re-renderiza a figura inteira
+    fig = plt.figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+
     # Gráfico 1: Tempo de execução
     methods = list(results.keys())
     times = [results[m]['tempo'] for m in methods]
     colors = [results[m]['cor'] for m in methods]
-    
-    ax1 = axes[0]
+
     bars1 = ax1.bar(methods, times, color=colors, alpha=0.7, edgecolor='black', linewidth=1.5)
     ax1.set_ylabel('Tempo (segundos)', fontsize=12, fontweight='bold')
     ax1.set_title('Tempo de Execução por Método', fontsize=14, fontweight='bold')
     ax1.grid(axis='y', alpha=0.3, linestyle='--')
-    
-    # Adicionar valores nas barras
-    for bar, time_val in zip(bars1, times):
-        height = bar.get_height()
-        ax1.text(bar.get_x() + bar.get_width()/2., height,
-                f'{time_val:.2f}s',
-                ha='center', va='bottom', fontweight='bold')
-    
+
+    # Adicionar valores nas barras (bar_label evita o loop Python)
+    ax1.bar_label(bars1, fmt='%.2fs', padding=3, fontweight='bold')
+
     # Gráfico 2: Qualidade da solução
     objectives = [results[m]['objetivo'] for m in methods]
-    
-    ax2 = axes[1]
+
     bars2 = ax2.bar(methods, objectives, color=colors, alpha=0.7, edgecolor='black', linewidth=1.5)
     ax2.set_ylabel('Valor Objetivo', fontsize=12, fontweight='bold')
     ax2.set_title('Qualidade da Solução por Método', fontsize=14, fontweight='bold')
     ax2.grid(axis='y', alpha=0.3, linestyle='--')
-    
+
     # Adicionar valores nas barras
-    for bar, obj_val in zip(bars2, objectives):
-        height = bar.get_height()
-        ax2.text(bar.get_x() + bar.get_width()/2., height,
-                f'{obj_val:.0f}',
-                ha='center', va='bottom', fontweight='bold')
-    
+    ax2.bar_label(bars2, fmt='%.0f', padding=3, fontweight='bold')
+
     # Marcar o melhor
     best_idx = np.argmin(objectives)
     bars2[best_idx].set_edgecolor('gold')
     bars2[best_idx].set_linewidth(3)
-    ax2.text(bars2[best_idx].get_x() + bars2[best_idx].get_width()/2., 
+    ax2.text(bars2[best_idx].get_x() + bars2[best_idx].get_width()/2.,
              bars2[best_idx].get_height() * 1.02,
-             '⭐ MELHOR', ha='center', va='bottom', 
+             '⭐ MELHOR', ha='center', va='bottom',
              fontweight='bold', color='darkgreen', fontsize=10)
-    
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/comparison_chart.png', dpi=150, bbox_inches='tight')
+
+    fig.tight_layout()
+    fig.savefig(f'{output_dir}/comparison_chart.png', dpi=150)
     print(f"  ✓ Gráfico salvo: comparison_chart.png")
-    
-    # Gráfico 2: Tempo vs Qualidade (scatter plot)
-    fig, ax = plt.subplots(figsize=(10, 7))
-    
+
+    # Gráfico 2: Tempo vs Qualidade (scatter plot) — reutilizar a figura
+    fig.clear()
+    fig.set_size_inches(10, 7)
+    ax = fig.add_subplot(111)
+
     for method in methods:
         x = results[method]['tempo']
         y = results[method]['objetivo']
@@ -206,16 +223,25 @@ def _create_visualizations(results, output_dir, num_days, num_patients):
                   label=f'Solução Ótima: {optimal:.0f}', alpha=0.7)
         ax.legend(fontsize=11)
     
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/time_vs_quality.png', dpi=150, bbox_inches='tight')
+    fig.tight_layout()
+    fig.savefig(f'{output_dir}/time_vs_quality.png', dpi=150)
     print(f"  ✓ Gráfico salvo: time_vs_quality.png")
-    
-    plt.close('all')
+
+    plt.close(fig)
 
 
 def _create_report(results, data, lambda1, lambda2, output_dir):
     """Cria relatório textual detalhado."""
-    
+    import pandas as pd
+
+    # Tabela única: melhores/desvios calculados vetorialmente (idxmin e
+    # aritmética de colunas) em vez de vários min()/loops sobre o dict
+    df = pd.DataFrame.from_dict(results, orient='index')
+    exact_label = 'Branch & Bound\n(Exato)'
+
+    # Exportar também em CSV para análise posterior
+    df.drop(columns=['cor']).to_csv(f'{output_dir}/results.csv', index_label='metodo')
+
     with open(f'{output_dir}/report.txt', 'w', encoding='utf-8') as f:
         f.write("="*80 + "\n")
         f.write("RELATÓRIO: COMPARAÇÃO DE MÉTODOS DE OTIMIZAÇÃO\n")
@@ -244,26 +270,26 @@ def _create_report(results, data, lambda1, lambda2, output_dir):
         
         f.write("3. ANÁLISE COMPARATIVA\n")
         f.write("-" * 80 + "\n\n")
-        
-        # Encontrar melhor
-        best_method = min(results.items(), key=lambda x: x[1]['objetivo'])
-        fastest_method = min(results.items(), key=lambda x: x[1]['tempo'])
-        
-        f.write(f"  ⭐ MELHOR SOLUÇÃO: {best_method[0].replace(chr(10), ' ')}\n")
-        f.write(f"     Objetivo: {best_method[1]['objetivo']:.2f}\n\n")
-        
-        f.write(f"  ⚡ MÉTODO MAIS RÁPIDO: {fastest_method[0].replace(chr(10), ' ')}\n")
-        f.write(f"     Tempo: {fastest_method[1]['tempo']:.4f}s\n\n")
-        
+
+        # Encontrar melhor (idxmin vetorizado sobre as colunas)
+        best_method = df['objetivo'].idxmin()
+        fastest_method = df['tempo'].idxmin()
+
+        f.write(f"  ⭐ MELHOR SOLUÇÃO: {best_method.replace(chr(10), ' ')}\n")
+        f.write(f"     Objetivo: {df.loc[best_method, 'objetivo']:.2f}\n\n")
+
+        f.write(f"  ⚡ MÉTODO MAIS RÁPIDO: {fastest_method.replace(chr(10), ' ')}\n")
+        f.write(f"     Tempo: {df.loc[fastest_method, 'tempo']:.4f}s\n\n")
+
         # Comparar qualidade vs tempo
-        if 'Branch & Bound\n(Exato)' in results:
-            optimal = results['Branch & Bound\n(Exato)']['objetivo']
-            
+        if exact_label in df.index:
+            optimal = df.loc[exact_label, 'objetivo']
+            deviation = (df['objetivo'] - optimal) / optimal * 100
+
             f.write("  📊 DESVIO EM RELAÇÃO AO ÓTIMO:\n")
-            for method, res in results.items():
-                if method != 'Branch & Bound\n(Exato)':
-                    deviation = ((res['objetivo'] - optimal) / optimal) * 100
-                    f.write(f"     {method.replace(chr(10), ' ')}: +{deviation:.2f}%\n")
+            for method in df.index:
+                if method != exact_label:
+                    f.write(f"     {method.replace(chr(10), ' ')}: +{deviation[method]:.2f}%\n")
             f.write("\n")
         
         f.write("4. CONCLUSÕES\n")
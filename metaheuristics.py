@@ -3,271 +3,953 @@ Metaheurísticas para o problema de alocação de pacientes.
 Implementa Simulated Annealing e Tabu Search (Métodos 2 e 3).
 """
 
-import random
 import math
 import time
-import copy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from data_parser import PatientAllocationData
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba é opcional: sem ele a avaliação usa o caminho Python puro
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+
+def _build_soa(data: PatientAllocationData):
+    """
+    Constrói (e cacheia no objeto de dados) a representação SoA
+    (structure-of-arrays) do problema, usada pelo kernel de avaliação.
+
+    Devolve um dict com arrays numpy indexados por paciente (0..P-1),
+    enfermaria (0..W-1) e especialização (0..S-1), mais os mapas de
+    índices para converter os ids originais.
+    """
+    cached = getattr(data, '_soa', None)
+    if cached is not None:
+        return cached
+
+    patient_ids = list(data.patients.keys())
+    ward_names = list(data.wards.keys())
+    spec_names = list(data.specialisms.keys())
+
+    patient_index = {pid: i for i, pid in enumerate(patient_ids)}
+    ward_index = {w: i for i, w in enumerate(ward_names)}
+    spec_index = {s: i for i, s in enumerate(spec_names)}
+
+    P, W, S, D = len(patient_ids), len(ward_names), len(spec_names), data.num_days
+
+    earliest = np.empty(P, dtype=np.int64)
+    latest = np.empty(P, dtype=np.int64)
+    los = np.empty(P, dtype=np.int64)
+    surgery = np.empty(P, dtype=np.float64)
+    spec_of = np.empty(P, dtype=np.int64)
+
+    max_los = max(p['los'] for p in data.patients.values())
+    workload = np.zeros((P, max_los), dtype=np.float64)
+
+    # Fator de compatibilidade especialização×enfermaria, calculado uma
+    # única vez por especialização (S×W) em vez de por paciente:
+    # 0 = incompatível, 1 = especialização principal, workload_factor = menor
+    spec_factor = np.zeros((S, W), dtype=np.float64)
+    compat_by_spec = {}
+    for s, spec in enumerate(spec_names):
+        for w, ward_name in enumerate(ward_names):
+            ward = data.wards[ward_name]
+            if spec == ward['major_specialization']:
+                spec_factor[s, w] = 1.0
+            elif spec in ward['minor_specializations']:
+                spec_factor[s, w] = data.specialisms[spec]['workload_factor']
+        compat_by_spec[spec] = tuple(
+            ward_names[w] for w in range(W) if spec_factor[s, w] > 0.0)
+
+    for i, pid in enumerate(patient_ids):
+        p = data.patients[pid]
+        earliest[i] = p['earliest']
+        latest[i] = p['latest']
+        los[i] = p['los']
+        surgery[i] = p['surgery_duration']
+        spec_of[i] = spec_index[p['specialization']]
+        workload[i, :len(p['workload_per_day'])] = p['workload_per_day']
+
+    # Vista por paciente (P×W) obtida por indexação da matriz por especialização
+    compat_factor = spec_factor[spec_of]
+
+    bed_capacity = np.empty(W, dtype=np.int64)
+    workload_capacity = np.empty(W, dtype=np.float64)
+    carryover_patients = np.zeros((W, D), dtype=np.int64)
+    carryover_workload = np.zeros((W, D), dtype=np.float64)
+
+    for w, ward_name in enumerate(ward_names):
+        ward = data.wards[ward_name]
+        bed_capacity[w] = ward['bed_capacity']
+        workload_capacity[w] = ward['workload_capacity']
+        carryover_patients[w, :] = ward['carryover_patients'][:D]
+        carryover_workload[w, :] = ward['carryover_workload'][:D]
+
+    ot_time = np.zeros((S, D), dtype=np.float64)
+    for s, spec_name in enumerate(spec_names):
+        ot_time[s, :] = data.specialisms[spec_name]['ot_time'][:D]
+
+    # Enfermarias compatíveis por paciente, em formato "ragged" plano
+    # (flat + offsets) para uso dentro de kernels Numba; as listas por
+    # especialização já estão calculadas, basta reutilizá-las
+    spec_ward_lists = [
+        [w for w in range(W) if spec_factor[s, w] > 0.0] for s in range(S)]
+    compat_offsets = np.zeros(P + 1, dtype=np.int64)
+    compat_lists = []
+    for i in range(P):
+        compat_lists.extend(spec_ward_lists[spec_of[i]])
+        compat_offsets[i + 1] = len(compat_lists)
+    compat_wards_flat = np.array(compat_lists, dtype=np.int64)
+
+    soa = {
+        'patient_ids': patient_ids,
+        'ward_names': ward_names,
+        'patient_index': patient_index,
+        'ward_index': ward_index,
+        'spec_index': spec_index,
+        'earliest': earliest,
+        'latest': latest,
+        'los': los,
+        'surgery': surgery,
+        'spec_of': spec_of,
+        'workload': workload,
+        'compat_factor': compat_factor,
+        'bed_capacity': bed_capacity,
+        'workload_capacity': workload_capacity,
+        'carryover_patients': carryover_patients,
+        'carryover_workload': carryover_workload,
+        'ot_time': ot_time,
+        'num_days': D,
+        'compat_wards_flat': compat_wards_flat,
+        'compat_offsets': compat_offsets,
+        'compat_by_spec': compat_by_spec,
+    }
+    data._soa = soa
+    return soa
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _evaluate_kernel(ward_of, day_of, earliest, latest, los, surgery, spec_of,
+                     workload, compat_factor, bed_capacity, workload_capacity,
+                     carryover_patients, carryover_workload, ot_time, num_days,
+                     weight_delay, weight_overtime, weight_undertime,
+                     lambda1, lambda2):
+    """
+    Kernel de avaliação de uma solução completa (viabilidade + objetivo).
+
+    Recebe apenas arrays numpy para poder ser compilado pelo Numba; a
+    lógica é idêntica a Solution._check_feasibility /
+    _calculate_operational_cost / _calculate_workload_balance.
+
+    Returns:
+        (feasible, objective): feasible é 0/1; objective é inf se inviável.
+    """
+    P = ward_of.shape[0]
+    W = bed_capacity.shape[0]
+    S = ot_time.shape[0]
+
+    # Janelas temporais e compatibilidade enfermaria-especialização
+    for i in range(P):
+        if day_of[i] < earliest[i] or day_of[i] > latest[i]:
+            return 0, np.inf
+        if compat_factor[i, ward_of[i]] == 0.0:
+            return 0, np.inf
+
+    # Acumular ocupação de camas, carga de trabalho e tempo de bloco
+    occupancy = np.zeros((W, num_days), dtype=np.int64)
+    ward_workload = np.zeros((W, num_days), dtype=np.float64)
+    ot_used = np.zeros((S, num_days), dtype=np.float64)
+
+    for i in range(P):
+        w = ward_of[i]
+        d0 = day_of[i]
+        factor = compat_factor[i, w]
+        ot_used[spec_of[i], d0] += surgery[i]
+
+        for t in range(los[i]):
+            d = d0 + t
+            if d >= num_days:
+                break
+            occupancy[w, d] += 1
+            ward_workload[w, d] += workload[i, t] * factor
+
+    # Capacidade de camas
+    for w in range(W):
+        for d in range(num_days):
+            if occupancy[w, d] + carryover_patients[w, d] > bed_capacity[w]:
+                return 0, np.inf
+
+    # Objetivo 1: custo operacional (delays + overtime + undertime)
+    cost = 0.0
+    for i in range(P):
+        cost += weight_delay * (day_of[i] - earliest[i])
+
+    for s in range(S):
+        for d in range(num_days):
+            diff = ot_used[s, d] - ot_time[s, d]
+            if diff > 0:
+                cost += weight_overtime * diff
+            else:
+                cost += weight_undertime * (-diff)
+
+    # Objetivo 2: máximo da carga de trabalho normalizada
+    max_workload = 0.0
+    for w in range(W):
+        for d in range(num_days):
+            normalized = (ward_workload[w, d] + carryover_workload[w, d]) / workload_capacity[w]
+            if normalized > max_workload:
+                max_workload = normalized
+
+    return 1, lambda1 * cost + lambda2 * max_workload
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _sa_kernel(ward_of, day_of, max_iterations, initial_temp, cooling_rate,
+               seed, earliest, latest, los, surgery, spec_of, workload,
+               compat_factor, bed_capacity, workload_capacity,
+               carryover_patients, carryover_workload, ot_time, num_days,
+               weight_delay, weight_overtime, weight_undertime,
+               lambda1, lambda2, compat_wards_flat, compat_offsets):
+    """
+    Loop interno do Simulated Annealing compilado com Numba.
+
+    Opera diretamente sobre os arrays (ward_of, day_of) da SoA; as três
+    operações de vizinhança (change_day, change_ward, swap), a aceitação
+    de Metropolis e o arrefecimento seguem a versão Python original.
+
+    Returns:
+        (best_ward, best_day, best_objective)
+    """
+    np.random.seed(seed)
+    P = ward_of.shape[0]
+
+    cur_ward = ward_of.copy()
+    cur_day = day_of.copy()
+    _, cur_obj = _evaluate_kernel(
+        cur_ward, cur_day, earliest, latest, los, surgery, spec_of,
+        workload, compat_factor, bed_capacity, workload_capacity,
+        carryover_patients, carryover_workload, ot_time, num_days,
+        weight_delay, weight_overtime, weight_undertime, lambda1, lambda2)
+
+    best_ward = cur_ward.copy()
+    best_day = cur_day.copy()
+    best_obj = cur_obj
+
+    temperature = initial_temp
+
+    for iteration in range(max_iterations):
+        # Gerar vizinho
+        nb_ward = cur_ward.copy()
+        nb_day = cur_day.copy()
+
+        i = np.random.randint(0, P)
+        operation = np.random.randint(0, 3)
+
+        if operation == 0:
+            # Mudar o dia de admissão
+            new_day = np.random.randint(earliest[i], latest[i] + 1)
+            if new_day < num_days:
+                nb_day[i] = new_day
+
+        elif operation == 1:
+            # Mudar de enfermaria (se houver alternativa compatível)
+            start = compat_offsets[i]
+            n_compat = compat_offsets[i + 1] - start
+            if n_compat > 1:
+                j = np.random.randint(0, n_compat - 1)
+                k = 0
+                for t in range(start, start + n_compat):
+                    w = compat_wards_flat[t]
+                    if w == nb_ward[i]:
+                        continue
+                    if k == j:
+                        nb_ward[i] = w
+                        break
+                    k += 1
+
+        else:
+            # Trocar dias de dois pacientes
+            i2 = np.random.randint(0, P)
+            if i2 != i:
+                tmp = nb_day[i]
+                nb_day[i] = nb_day[i2]
+                nb_day[i2] = tmp
+
+        _, nb_obj = _evaluate_kernel(
+            nb_ward, nb_day, earliest, latest, los, surgery, spec_of,
+            workload, compat_factor, bed_capacity, workload_capacity,
+            carryover_patients, carryover_workload, ot_time, num_days,
+            weight_delay, weight_overtime, weight_undertime, lambda1, lambda2)
+
+        # Aceitar ou rejeitar
+        delta = nb_obj - cur_obj
+
+        # delta >= 40·T rejeita de certeza (exp(-40) ~ 4e-18): saltar o
+        # sorteio e a exponencial nesses casos (inclui moves inviáveis)
+        if delta < 0 or (temperature > 0 and delta < 40.0 * temperature and
+                         np.random.random() < np.exp(-delta / temperature)):
+            cur_ward = nb_ward
+            cur_day = nb_day
+            cur_obj = nb_obj
+
+            if cur_obj < best_obj:
+                best_obj = cur_obj
+                best_ward = cur_ward.copy()
+                best_day = cur_day.copy()
+
+        # Arrefecer
+        temperature *= cooling_rate
+
+        # Critério de paragem
+        if temperature < 0.01:
+            break
+
+    return best_ward, best_day, best_obj
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _ts_enumerate_kernel(sample, ward_of, day_of, occupancy, norm_workload,
+                         ot_used, delay_sum, otu_cost,
+                         earliest, latest, los, surgery, spec_of, workload,
+                         compat_factor, bed_capacity, workload_capacity,
+                         carryover_patients, ot_time, num_days,
+                         weight_delay, weight_overtime, weight_undertime,
+                         lambda1, lambda2, compat_wards_flat, compat_offsets,
+                         tabu_moves, n_tabu, aspiration):
+    """
+    Enumeração da vizinhança do Tabu Search compilada com Numba.
+
+    Para cada paciente da amostra avalia todos os candidatos
+    (enfermaria compatível, dia na janela) por delta sobre os
+    acumuladores incrementais da solução atual — sem os alterar — e
+    devolve o melhor movimento não-tabu (ou tabu que bata a aspiração).
+
+    Returns:
+        (best_i, best_w, best_d, best_obj); best_i é -1 se não houver
+        movimento admissível.
+    """
+    W = bed_capacity.shape[0]
+    best_i = -1
+    best_w = -1
+    best_d = -1
+    best_obj = np.inf
+
+    for si in range(sample.shape[0]):
+        i = sample[si]
+        old_w = ward_of[i]
+        old_d = day_of[i]
+        s = spec_of[i]
+        stay = los[i]
+
+        for t in range(compat_offsets[i], compat_offsets[i + 1]):
+            w = compat_wards_flat[t]
+
+            for d in range(earliest[i], min(latest[i] + 1, num_days)):
+                if w == old_w and d == old_d:
+                    continue
+
+                # Capacidade de camas nas células de destino (descontando
+                # a própria estadia antiga quando se sobrepõe)
+                ok = True
+                for k in range(stay):
+                    dd = d + k
+                    if dd >= num_days:
+                        break
+                    occ = occupancy[w, dd] + carryover_patients[w, dd] + 1
+                    if w == old_w and old_d <= dd < old_d + stay:
+                        occ -= 1
+                    if occ > bed_capacity[w]:
+                        ok = False
+                        break
+                if not ok:
+                    continue
+
+                # Custo de atrasos: só muda a parcela do paciente movido
+                new_delay = delay_sum + (d - old_d)
+
+                # Custo do bloco operatório: no máximo duas células mudam
+                new_otu = otu_cost
+                if d != old_d:
+                    diff = ot_used[s, old_d] - ot_time[s, old_d]
+                    before = weight_overtime * diff if diff > 0 else weight_undertime * (-diff)
+                    diff -= surgery[i]
+                    after = weight_overtime * diff if diff > 0 else weight_undertime * (-diff)
+                    new_otu += after - before
+
+                    diff = ot_used[s, d] - ot_time[s, d]
+                    before = weight_overtime * diff if diff > 0 else weight_undertime * (-diff)
+                    diff += surgery[i]
+                    after = weight_overtime * diff if diff > 0 else weight_undertime * (-diff)
+                    new_otu += after - before
+
+                # Máximo da carga normalizada com as células tocadas ajustadas
+                old_factor = compat_factor[i, old_w] / workload_capacity[old_w]
+                new_factor = compat_factor[i, w] / workload_capacity[w]
+                zmax = 0.0
+                for w2 in range(W):
+                    for d2 in range(num_days):
+                        v = norm_workload[w2, d2]
+                        if w2 == old_w and old_d <= d2 < old_d + stay:
+                            v -= workload[i, d2 - old_d] * old_factor
+                        if w2 == w and d <= d2 < d + stay:
+                            v += workload[i, d2 - d] * new_factor
+                        if v > zmax:
+                            zmax = v
+
+                obj = lambda1 * (weight_delay * new_delay + new_otu) + lambda2 * zmax
+
+                if obj < best_obj:
+                    tabu = False
+                    for r in range(n_tabu):
+                        if tabu_moves[r, 0] == i and tabu_moves[r, 1] == w \
+                                and tabu_moves[r, 2] == d:
+                            tabu = True
+                            break
+                    if not tabu or obj < aspiration:
+                        best_obj = obj
+                        best_i = i
+                        best_w = w
+                        best_d = d
+
+    return best_i, best_w, best_d, best_obj
+
 
 class Solution:
-    """Representa uma solução do problema."""
-    
+    """
+    Representa uma solução do problema.
+
+    A alocação é guardada em formato SoA (structure-of-arrays): dois
+    arrays int32 indexados pelo índice contíguo de paciente da SoA,
+    ward_idx[i] e day[i], com -1 a marcar paciente ainda não alocado.
+    A vista em dict {patient_id: {'ward', 'day'}} continua disponível
+    através da propriedade `allocation` (usada nos relatórios e no
+    warm start do MILP).
+    """
+
     def __init__(self, data: PatientAllocationData):
         self.data = data
-        self.allocation = {}  # {patient_id: {'ward': ward_name, 'day': day}}
+        self.soa = _build_soa(data)
+        P = len(self.soa['patient_ids'])
+        self.ward_idx = np.full(P, -1, dtype=np.int32)
+        self.day = np.full(P, -1, dtype=np.int32)
         self.objective_value = float('inf')
         self.feasible = False
-        
+
+        # Acumuladores para avaliação incremental (ver apply_move);
+        # construídos sob demanda por _build_move_caches
+        self._ot_used = None
+
+    @property
+    def allocation(self):
+        """Vista da alocação como dict {patient_id: {'ward': nome, 'day': dia}}."""
+        ward_names = self.soa['ward_names']
+        return {
+            pid: {'ward': ward_names[self.ward_idx[i]], 'day': int(self.day[i])}
+            for i, pid in enumerate(self.soa['patient_ids'])
+            if self.ward_idx[i] >= 0
+        }
+
     def copy(self):
-        """Cria uma cópia da solução."""
-        new_sol = Solution(self.data)
-        new_sol.allocation = copy.deepcopy(self.allocation)
+        """Cria uma cópia da solução (cópia dos dois arrays)."""
+        # __new__ evita o __init__, que alocaria dois arrays np.full só
+        # para serem descartados pelas cópias seguintes
+        new_sol = Solution.__new__(Solution)
+        new_sol.data = self.data
+        new_sol.soa = self.soa
+        new_sol.ward_idx = self.ward_idx.copy()
+        new_sol.day = self.day.copy()
         new_sol.objective_value = self.objective_value
         new_sol.feasible = self.feasible
+        # Os acumuladores incrementais não são copiados (seriam partilhados);
+        # a cópia reconstrói-os sob demanda
+        new_sol._ot_used = None
         return new_sol
-    
+
+    def copy_from(self, other):
+        """Copia o conteúdo de outra solução para esta, sem alocar arrays."""
+        self.ward_idx[:] = other.ward_idx
+        self.day[:] = other.day
+        self.objective_value = other.objective_value
+        self.feasible = other.feasible
+        self._ot_used = None
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        # Não há nada para percorrer recursivamente: os dados do problema
+        # são partilhados de propósito e os arrays copiam-se com .copy()
+        return self.copy()
+
     def evaluate(self, lambda1=0.5, lambda2=0.5):
         """
         Calcula o valor objetivo da solução.
         Verifica também se a solução é viável.
+
+        Usa o kernel compilado com Numba quando disponível; caso
+        contrário recorre às verificações numpy vetorizadas.
         """
+        soa = self.soa
+
+        # Memoização por assinatura da alocação: vizinhanças que revisitam
+        # estados já avaliados (movimento + inverso) saem daqui de graça.
+        # A cache vive na SoA, logo é por instância do problema.
+        cache = soa.setdefault('_eval_cache', {})
+        key = (self.ward_idx.tobytes(), self.day.tobytes(), lambda1, lambda2)
+        cached = cache.get(key)
+        if cached is not None:
+            self.feasible, self.objective_value = cached
+            return self.objective_value
+
+        if NUMBA_AVAILABLE and not np.any(self.ward_idx < 0):
+            feasible, objective = _evaluate_kernel(
+                self.ward_idx, self.day,
+                soa['earliest'], soa['latest'], soa['los'], soa['surgery'],
+                soa['spec_of'], soa['workload'], soa['compat_factor'],
+                soa['bed_capacity'], soa['workload_capacity'],
+                soa['carryover_patients'], soa['carryover_workload'],
+                soa['ot_time'], soa['num_days'],
+                self.data.weight_delay, self.data.weight_overtime,
+                self.data.weight_undertime, lambda1, lambda2)
+
+            self.feasible = bool(feasible)
+            self.objective_value = objective
+            return self._remember(cache, key)
+
         # Verificar viabilidade e calcular objetivo
         if not self._check_feasibility():
             self.feasible = False
             self.objective_value = float('inf')
-            return self.objective_value
-        
+            return self._remember(cache, key)
+
         self.feasible = True
-        
+
         # Calcular objetivo 1: custo operacional
         f1 = self._calculate_operational_cost()
-        
+
         # Calcular objetivo 2: equilíbrio de carga
         f2 = self._calculate_workload_balance()
-        
+
         self.objective_value = lambda1 * f1 + lambda2 * f2
+        return self._remember(cache, key)
+
+    def _remember(self, cache, key):
+        """Guarda o resultado da avaliação na cache (limitada) e devolve-o."""
+        if len(cache) >= 65536:
+            cache.clear()
+        cache[key] = (self.feasible, self.objective_value)
         return self.objective_value
-    
+
+    def _occupancy_and_workload(self):
+        """
+        Acumula a ocupação de camas (W×D, int) e a carga de trabalho
+        ponderada (W×D, float) dos pacientes alocados, com np.add.at
+        sobre máscaras por dia de internamento.
+        """
+        soa = self.soa
+        W, D = soa['bed_capacity'].shape[0], soa['num_days']
+        occupancy = np.zeros((W, D), dtype=np.int64)
+        ward_workload = np.zeros((W, D), dtype=np.float64)
+
+        allocated = self.ward_idx >= 0
+        factor = np.zeros(self.ward_idx.shape[0])
+        factor[allocated] = soa['compat_factor'][
+            np.flatnonzero(allocated), self.ward_idx[allocated]]
+
+        max_los = soa['workload'].shape[1]
+        for t in range(max_los):
+            active = allocated & (soa['los'] > t) & (self.day + t < D)
+            if not np.any(active):
+                continue
+            w = self.ward_idx[active]
+            d = self.day[active] + t
+            np.add.at(occupancy, (w, d), 1)
+            np.add.at(ward_workload, (w, d),
+                      soa['workload'][active, t] * factor[active])
+
+        return occupancy, ward_workload
+
     def _check_feasibility(self):
         """Verifica se a solução respeita todas as restrições."""
-        
+        soa = self.soa
+
         # 1. Verificar se todos os pacientes foram alocados
-        if len(self.allocation) != len(self.data.patients):
+        if np.any(self.ward_idx < 0):
             return False
-        
+
         # 2. Verificar janelas temporais
-        for patient_id, alloc in self.allocation.items():
-            patient = self.data.patients[patient_id]
-            if not (patient['earliest'] <= alloc['day'] <= patient['latest']):
-                return False
-        
-        # 3. Verificar capacidade de camas
-        for ward_name, ward in self.data.wards.items():
-            for d in range(self.data.num_days):
-                patients_count = ward['carryover_patients'][d]
-                
-                for patient_id, alloc in self.allocation.items():
-                    if alloc['ward'] == ward_name:
-                        patient = self.data.patients[patient_id]
-                        admit_day = alloc['day']
-                        los = patient['los']
-                        
-                        # Paciente está na enfermaria no dia d?
-                        if admit_day <= d < admit_day + los:
-                            patients_count += 1
-                
-                if patients_count > ward['bed_capacity']:
-                    return False
-        
-        # 4. Verificar compatibilidade enfermaria-especialização
-        for patient_id, alloc in self.allocation.items():
-            patient = self.data.patients[patient_id]
-            spec = patient['specialization']
-            ward = self.data.wards[alloc['ward']]
-            
-            if spec != ward['major_specialization'] and spec not in ward['minor_specializations']:
-                return False
-        
-        return True
-    
+        if np.any((self.day < soa['earliest']) | (self.day > soa['latest'])):
+            return False
+
+        # 3. Verificar compatibilidade enfermaria-especialização
+        rows = np.arange(self.ward_idx.shape[0])
+        if np.any(soa['compat_factor'][rows, self.ward_idx] == 0.0):
+            return False
+
+        # 4. Verificar capacidade de camas
+        total = self._bed_occupancy() + soa['carryover_patients']
+        return not np.any(total > soa['bed_capacity'][:, None])
+
+    def _bed_occupancy(self):
+        """
+        Ocupação de camas (W×D) numa única passagem vetorizada: a matriz
+        de presença (P×D) diz em que dias cada paciente está internado e
+        np.add.at soma cada linha na enfermaria correspondente.
+        """
+        soa = self.soa
+        W, D = soa['bed_capacity'].shape[0], soa['num_days']
+        d_range = np.arange(D)
+        present = (self.day[:, None] <= d_range) & \
+                  (d_range < self.day[:, None] + soa['los'][:, None])
+        occupancy = np.zeros((W, D), dtype=np.int64)
+        np.add.at(occupancy, self.ward_idx, present)
+        return occupancy
+
     def _calculate_operational_cost(self):
         """Calcula o custo operacional (delays + overtime + undertime)."""
-        cost = 0.0
-        
-        # 1. Calcular delays
-        for patient_id, alloc in self.allocation.items():
-            patient = self.data.patients[patient_id]
-            delay = alloc['day'] - patient['earliest']
-            cost += self.data.weight_delay * delay
-        
-        # 2. Calcular overtime e undertime por especialização e dia
-        for spec in self.data.specialisms.keys():
-            for d in range(self.data.num_days):
-                ot_used = 0
-                
-                # Somar duração das cirurgias no dia d
-                for patient_id, alloc in self.allocation.items():
-                    patient = self.data.patients[patient_id]
-                    if patient['specialization'] == spec and alloc['day'] == d:
-                        ot_used += patient['surgery_duration']
-                
-                ot_available = self.data.specialisms[spec]['ot_time'][d]
-                
-                if ot_used > ot_available:
-                    overtime = ot_used - ot_available
-                    cost += self.data.weight_overtime * overtime
-                else:
-                    undertime = ot_available - ot_used
-                    cost += self.data.weight_undertime * undertime
-        
+        soa = self.soa
+        S, D = soa['ot_time'].shape
+
+        # 1. Delays (dias de atraso face ao earliest)
+        cost = self.data.weight_delay * float(np.sum(self.day - soa['earliest']))
+
+        # 2. Overtime e undertime por especialização e dia
+        ot_used = np.zeros((S, D))
+        np.add.at(ot_used, (soa['spec_of'], self.day), soa['surgery'])
+
+        diff = ot_used - soa['ot_time']
+        cost += self.data.weight_overtime * float(np.sum(diff.clip(min=0)))
+        cost += self.data.weight_undertime * float(np.sum((-diff).clip(min=0)))
+
         return cost
-    
+
     def _calculate_workload_balance(self):
         """Calcula o máximo da carga de trabalho normalizada (objetivo de equilíbrio)."""
-        max_workload = 0.0
-        
-        for ward_name, ward in self.data.wards.items():
-            workload_capacity = ward['workload_capacity']
-            
-            for d in range(self.data.num_days):
-                # Carga pré-existente
-                total_workload = ward['carryover_workload'][d]
-                
-                # Adicionar carga dos pacientes alocados
-                for patient_id, alloc in self.allocation.items():
-                    if alloc['ward'] == ward_name:
-                        patient = self.data.patients[patient_id]
-                        admit_day = alloc['day']
-                        los = patient['los']
-                        
-                        # Paciente está internado no dia d?
-                        if admit_day <= d < admit_day + los:
-                            day_of_stay = d - admit_day
-                            workload = patient['workload_per_day'][day_of_stay]
-                            
-                            # Aplicar fator se for especialização menor
-                            spec = patient['specialization']
-                            if spec != ward['major_specialization'] and spec in ward['minor_specializations']:
-                                workload *= self.data.specialisms[spec]['workload_factor']
-                            
-                            total_workload += workload
-                
-                # Normalizar
-                normalized_workload = total_workload / workload_capacity
-                max_workload = max(max_workload, normalized_workload)
-        
-        return max_workload
+        soa = self.soa
+        _, ward_workload = self._occupancy_and_workload()
+        total = ward_workload + soa['carryover_workload']
+        return float(np.max(total / soa['workload_capacity'][:, None]))
+
+    def _build_move_caches(self):
+        """
+        Constrói os acumuladores usados pela avaliação incremental:
+        ocupação de camas, carga normalizada e bloco operatório por célula,
+        mais os totais escalares (delays, custo over/undertime) e os
+        contadores de violações (células acima da capacidade, pacientes
+        fora da janela ou em enfermaria incompatível).
+
+        Requer uma solução completa (sem pacientes por alocar).
+        """
+        soa = self.soa
+
+        occupancy, ward_workload = self._occupancy_and_workload()
+        self._occupancy = occupancy
+        self._norm_workload = (ward_workload + soa['carryover_workload']) \
+            / soa['workload_capacity'][:, None]
+        # Máximo mantido incrementalmente: evita varrer a matriz (W, D)
+        # inteira em cada movimento só para recomputar o objetivo f2
+        self._norm_max = float(self._norm_workload.max())
+        self._norm_max_stale = False
+
+        S, D = soa['ot_time'].shape
+        ot_used = np.zeros((S, D))
+        np.add.at(ot_used, (soa['spec_of'], self.day), soa['surgery'])
+        self._ot_used = ot_used
+
+        self._delay_sum = float(np.sum(self.day - soa['earliest']))
+        diff = ot_used - soa['ot_time']
+        self._otu_cost = \
+            self.data.weight_overtime * float(np.sum(diff.clip(min=0))) + \
+            self.data.weight_undertime * float(np.sum((-diff).clip(min=0)))
+
+        self._overcap = int(np.count_nonzero(
+            occupancy + soa['carryover_patients'] > soa['bed_capacity'][:, None]))
+        rows = np.arange(self.ward_idx.shape[0])
+        bad = (self.day < soa['earliest']) | (self.day > soa['latest']) | \
+              (soa['compat_factor'][rows, self.ward_idx] == 0.0)
+        self._nbad = int(np.count_nonzero(bad))
+
+    def _ot_cell_cost(self, s, d):
+        """Custo over/undertime da célula (especialização, dia) do bloco."""
+        diff = self._ot_used[s, d] - self.soa['ot_time'][s, d]
+        if diff > 0:
+            return self.data.weight_overtime * diff
+        return self.data.weight_undertime * (-diff)
+
+    def _apply_one(self, i, w, d0, sign):
+        """
+        Adiciona (sign=+1) ou remove (sign=-1) a contribuição do paciente i
+        alocado em (enfermaria w, dia d0) aos acumuladores incrementais.
+        Custo O(los) por chamada.
+        """
+        soa = self.soa
+        D = soa['num_days']
+
+        if d0 < soa['earliest'][i] or d0 > soa['latest'][i] or \
+                soa['compat_factor'][i, w] == 0.0:
+            self._nbad += sign
+
+        self._delay_sum += sign * float(d0 - soa['earliest'][i])
+
+        s = soa['spec_of'][i]
+        self._otu_cost -= self._ot_cell_cost(s, d0)
+        self._ot_used[s, d0] += sign * soa['surgery'][i]
+        self._otu_cost += self._ot_cell_cost(s, d0)
+
+        factor = soa['compat_factor'][i, w]
+        cap = soa['bed_capacity'][w]
+        for t in range(soa['los'][i]):
+            d = d0 + t
+            if d >= D:
+                break
+            over_before = self._occupancy[w, d] + soa['carryover_patients'][w, d] > cap
+            self._occupancy[w, d] += sign
+            over_after = self._occupancy[w, d] + soa['carryover_patients'][w, d] > cap
+            self._overcap += int(over_after) - int(over_before)
+            old_val = self._norm_workload[w, d]
+            new_val = old_val + \
+                sign * soa['workload'][i, t] * factor / soa['workload_capacity'][w]
+            self._norm_workload[w, d] = new_val
+            # Manutenção incremental do máximo: subidas atualizam-no em
+            # O(1); só quando a própria célula do máximo desce é que fica
+            # marcado para re-varrimento (raro na prática)
+            if new_val > self._norm_max:
+                self._norm_max = new_val
+                self._norm_max_stale = False
+            elif new_val < old_val and old_val >= self._norm_max - 1e-12:
+                self._norm_max_stale = True
+
+    def apply_move(self, i, new_ward, new_day, lambda1=0.5, lambda2=0.5):
+        """
+        Move o paciente i para (new_ward, new_day) e reavalia o objetivo
+        de forma incremental: só as células tocadas pelo movimento são
+        atualizadas (O(los)), em vez de reavaliar a solução inteira.
+
+        O movimento inverso com os valores antigos desfaz exatamente o
+        efeito, o que permite rejeitar movimentos sem copiar a solução.
+        """
+        if self._ot_used is None:
+            self._build_move_caches()
+
+        self._apply_one(i, int(self.ward_idx[i]), int(self.day[i]), -1)
+        self.ward_idx[i] = new_ward
+        self.day[i] = new_day
+        self._apply_one(i, new_ward, new_day, +1)
+
+        if self._overcap > 0 or self._nbad > 0:
+            self.feasible = False
+            self.objective_value = float('inf')
+        else:
+            self.feasible = True
+            f1 = self.data.weight_delay * self._delay_sum + self._otu_cost
+            if self._norm_max_stale:
+                self._norm_max = float(self._norm_workload.max())
+                self._norm_max_stale = False
+            f2 = self._norm_max
+            self.objective_value = lambda1 * f1 + lambda2 * f2
+        return self.objective_value
+
+    def move_delta(self, i, new_ward, new_day, lambda1=0.5, lambda2=0.5):
+        """
+        Objetivo que a solução teria após mover o paciente i para
+        (new_ward, new_day), sem alterar a solução: aplica o movimento
+        incremental e de seguida o inverso.
+        """
+        old_ward, old_day = int(self.ward_idx[i]), int(self.day[i])
+        new_obj = self.apply_move(i, new_ward, new_day, lambda1, lambda2)
+        self.apply_move(i, old_ward, old_day, lambda1, lambda2)
+        return new_obj
 
 
 class SimulatedAnnealing:
     """Implementação de Simulated Annealing."""
-    
-    def __init__(self, data: PatientAllocationData, lambda1=0.5, lambda2=0.5):
+
+    def __init__(self, data: PatientAllocationData, lambda1=0.5, lambda2=0.5,
+                 seed=None):
         self.data = data
         self.lambda1 = lambda1
         self.lambda2 = lambda2
-        
+
+        # PRNG rápido (PCG64) com buffer pré-preenchido: gerar uniformes
+        # em lote custa muito menos do que chamadas individuais a
+        # random.random, e o loop consome milhões deles
+        self.rng = np.random.default_rng(seed)
+        self._u = self.rng.random(8192)
+        self._ui = 0
+
         self.best_solution = None
         self.solve_time = None
-    
+
+    def _next_uniform(self):
+        """Próximo uniforme [0, 1) do buffer, repreenchendo quando esgota."""
+        if self._ui >= self._u.shape[0]:
+            self.rng.random(out=self._u)
+            self._ui = 0
+        u = self._u[self._ui]
+        self._ui += 1
+        return u
+
+    def _next_int(self, low, high):
+        """Inteiro uniforme em [low, high), tirado do buffer de uniformes."""
+        return low + int(self._next_uniform() * (high - low))
+
     def _generate_initial_solution(self):
-        """Gera uma solução inicial viável (greedy heuristic)."""
+        """
+        Gera uma solução inicial viável (greedy heuristic).
+
+        A grelha de camas livres (W×D) é mantida incrementalmente: cada
+        candidato (enfermaria, dia) só é testado contra a fatia da
+        estadia do paciente — O(los) por candidato — em vez de revalidar
+        a solução inteira.
+        """
         solution = Solution(self.data)
-        
+        soa = solution.soa
+        compat_flat = soa['compat_wards_flat']
+        compat_offsets = soa['compat_offsets']
+        D = soa['num_days']
+
+        # Camas livres por enfermaria e dia, já descontando o carryover
+        free_beds = soa['bed_capacity'][:, None] - soa['carryover_patients']
+
         # Ordenar pacientes por janela temporal (urgentes primeiro)
-        patients = sorted(
-            self.data.patients.items(),
-            key=lambda x: (x[1]['latest'] - x[1]['earliest'], x[1]['earliest'])
+        order = sorted(
+            range(len(soa['patient_ids'])),
+            key=lambda i: (soa['latest'][i] - soa['earliest'][i], soa['earliest'][i])
         )
-        
-        for patient_id, patient in patients:
-            spec = patient['specialization']
-            earliest = patient['earliest']
-            latest = patient['latest']
-            
-            # Encontrar enfermaria compatível
-            compatible_wards = []
-            for ward_name, ward in self.data.wards.items():
-                if spec == ward['major_specialization'] or spec in ward['minor_specializations']:
-                    compatible_wards.append(ward_name)
-            
+
+        for i in order:
+            start = compat_offsets[i]
+            end = compat_offsets[i + 1]
+            los = int(soa['los'][i])
+
             # Tentar alocar no primeiro dia possível
             allocated = False
-            for d in range(earliest, latest + 1):
-                if d >= self.data.num_days:
+            for d in range(soa['earliest'][i], soa['latest'][i] + 1):
+                if d >= D:
                     break
-                
-                for ward_name in compatible_wards:
-                    # Verificar se tem capacidade (simplificado)
-                    solution.allocation[patient_id] = {'ward': ward_name, 'day': d}
-                    
-                    if solution._check_feasibility():
+                d_end = min(d + los, D)
+
+                for t in range(start, end):
+                    w = compat_flat[t]
+                    if np.all(free_beds[w, d:d_end] > 0):
+                        solution.ward_idx[i] = w
+                        solution.day[i] = d
+                        free_beds[w, d:d_end] -= 1
                         allocated = True
                         break
-                
+
                 if allocated:
                     break
-            
+
             # Se não conseguiu alocar, forçar alocação (pode ficar inviável)
             if not allocated:
-                solution.allocation[patient_id] = {
-                    'ward': compatible_wards[0],
-                    'day': earliest
-                }
-        
+                w = compat_flat[start]
+                d = int(soa['earliest'][i])
+                solution.ward_idx[i] = w
+                solution.day[i] = d
+                free_beds[w, d:min(d + los, D)] -= 1
+
         solution.evaluate(self.lambda1, self.lambda2)
+
+        # Polimento fundido com a construção: uma única passagem de
+        # melhoramento por paciente com a avaliação incremental
+        # (move_delta), em vez de uma segunda varredura global com
+        # reavaliações completas da solução
+        if solution.feasible:
+            solution._build_move_caches()
+            for i in order:
+                best_obj = solution.objective_value
+                best_w = best_d = -1
+                for t in range(compat_offsets[i], compat_offsets[i + 1]):
+                    w = int(compat_flat[t])
+                    for d in range(soa['earliest'][i],
+                                   min(soa['latest'][i] + 1, D)):
+                        if w == solution.ward_idx[i] and d == solution.day[i]:
+                            continue
+                        obj = solution.move_delta(i, w, d,
+                                                  self.lambda1, self.lambda2)
+                        if obj < best_obj - 1e-9:
+                            best_obj = obj
+                            best_w, best_d = w, d
+                if best_w >= 0:
+                    solution.apply_move(i, best_w, best_d,
+                                        self.lambda1, self.lambda2)
+
         return solution
-    
+
     def _get_neighbor(self, solution):
-        """Gera uma solução vizinha fazendo pequenas modificações."""
+        """
+        Gera uma solução vizinha fazendo pequenas modificações.
+
+        Devolve (vizinho, movimento): o movimento é o tuplo de alterações
+        (i, enfermaria, dia) aplicadas — pequeno e hashável, para servir
+        de chave na lista tabu — ou None se a operação sorteada não
+        alterou nada.
+        """
         neighbor = solution.copy()
-        
-        # Escolher paciente aleatório
-        patient_id = random.choice(list(neighbor.allocation.keys()))
-        patient = self.data.patients[patient_id]
-        
-        # Tentar uma das três operações
-        operation = random.choice(['change_day', 'change_ward', 'swap'])
-        
+        moves = self._propose_move(neighbor)
+        for i, w, d in moves:
+            neighbor.ward_idx[i] = w
+            neighbor.day[i] = d
+        neighbor.evaluate(self.lambda1, self.lambda2)
+        return neighbor, (tuple(moves) if moves else None)
+
+    def _propose_move(self, solution):
+        """
+        Sorteia um movimento elementar (as mesmas três operações do
+        _get_neighbor) como lista de tuplos (i, enfermaria, dia), sem
+        copiar a solução — para aplicar com Solution.apply_move.
+        """
+        soa = solution.soa
+        i = self._next_int(0, solution.ward_idx.shape[0])
+        operation = ('change_day', 'change_ward', 'swap')[self._next_int(0, 3)]
+
         if operation == 'change_day':
-            # Mudar o dia de admissão
-            new_day = random.randint(patient['earliest'], patient['latest'])
-            if new_day < self.data.num_days:
-                neighbor.allocation[patient_id]['day'] = new_day
-        
+            new_day = self._next_int(int(soa['earliest'][i]), int(soa['latest'][i]) + 1)
+            if new_day < soa['num_days']:
+                return [(i, int(solution.ward_idx[i]), new_day)]
+
         elif operation == 'change_ward':
-            # Mudar de enfermaria (se possível)
-            spec = patient['specialization']
+            start = soa['compat_offsets'][i]
+            end = soa['compat_offsets'][i + 1]
             compatible_wards = [
-                w for w, ward in self.data.wards.items()
-                if spec == ward['major_specialization'] or spec in ward['minor_specializations']
+                w for w in soa['compat_wards_flat'][start:end]
+                if w != solution.ward_idx[i]
             ]
-            if len(compatible_wards) > 1:
-                current_ward = neighbor.allocation[patient_id]['ward']
-                compatible_wards.remove(current_ward)
-                neighbor.allocation[patient_id]['ward'] = random.choice(compatible_wards)
-        
-        elif operation == 'swap':
-            # Trocar dias de dois pacientes
-            patient_id2 = random.choice(list(neighbor.allocation.keys()))
-            if patient_id != patient_id2:
-                day1 = neighbor.allocation[patient_id]['day']
-                day2 = neighbor.allocation[patient_id2]['day']
-                neighbor.allocation[patient_id]['day'] = day2
-                neighbor.allocation[patient_id2]['day'] = day1
-        
-        neighbor.evaluate(self.lambda1, self.lambda2)
-        return neighbor
+            if compatible_wards:
+                new_ward = compatible_wards[self._next_int(0, len(compatible_wards))]
+                return [(i, int(new_ward), int(solution.day[i]))]
+
+        else:
+            i2 = self._next_int(0, solution.ward_idx.shape[0])
+            if i2 != i:
+                return [(i, int(solution.ward_idx[i]), int(solution.day[i2])),
+                        (i2, int(solution.ward_idx[i2]), int(solution.day[i]))]
+
+        return []
     
-    def solve(self, max_iterations=10000, initial_temp=1000, cooling_rate=0.95, verbose=True):
+    def solve(self, max_iterations=10000, initial_temp=1000, cooling_rate=0.95,
+              num_chains=1, verbose=True):
         """
         Resolve o problema usando Simulated Annealing.
-        
+
         Args:
             max_iterations: Número máximo de iterações
             initial_temp: Temperatura inicial
             cooling_rate: Taxa de arrefecimento
+            num_chains: Número de cadeias SA independentes; com Numba
+                correm em threads paralelas (o kernel liberta o GIL),
+                sem Numba correm sequencialmente
             verbose: Se True, mostra progresso
         """
         if verbose:
@@ -283,55 +965,141 @@ class SimulatedAnnealing:
         
         if verbose:
             print(f"Solução inicial: {current.objective_value:.2f} (viável: {current.feasible})")
-        
-        temperature = initial_temp
-        
-        for iteration in range(max_iterations):
-            # Gerar vizinho
-            neighbor = self._get_neighbor(current)
-            
-            # Aceitar ou rejeitar
-            delta = neighbor.objective_value - current.objective_value
-            
-            if delta < 0 or (temperature > 0 and random.random() < math.exp(-delta / temperature)):
-                current = neighbor
-                
-                # Atualizar melhor solução
-                if current.objective_value < self.best_solution.objective_value:
-                    self.best_solution = current.copy()
-                    if verbose and iteration % 1000 == 0:
-                        print(f"Iteração {iteration}: Nova melhor solução = {self.best_solution.objective_value:.2f}")
-            
-            # Arrefecer
-            temperature *= cooling_rate
-            
-            # Critério de paragem
-            if temperature < 0.01:
-                break
+
+        if NUMBA_AVAILABLE:
+            # Caminho rápido: todo o loop corre dentro do kernel Numba,
+            # diretamente sobre os arrays SoA da solução inicial
+            soa = _build_soa(self.data)
+            seeds = [int(self.rng.integers(2**31)) for _ in range(num_chains)]
+
+            def run_chain(seed):
+                return _sa_kernel(
+                    current.ward_idx, current.day, max_iterations,
+                    float(initial_temp), float(cooling_rate), seed,
+                    soa['earliest'], soa['latest'], soa['los'], soa['surgery'],
+                    soa['spec_of'], soa['workload'], soa['compat_factor'],
+                    soa['bed_capacity'], soa['workload_capacity'],
+                    soa['carryover_patients'], soa['carryover_workload'],
+                    soa['ot_time'], soa['num_days'],
+                    self.data.weight_delay, self.data.weight_overtime,
+                    self.data.weight_undertime, self.lambda1, self.lambda2,
+                    soa['compat_wards_flat'], soa['compat_offsets'])
+
+            if num_chains > 1:
+                # O kernel corre com nogil=True, por isso as cadeias
+                # progridem de facto em paralelo dentro de threads
+                with ThreadPoolExecutor(max_workers=num_chains) as executor:
+                    chain_results = list(executor.map(run_chain, seeds))
+            else:
+                chain_results = [run_chain(seeds[0])]
+
+            best_ward, best_day, best_obj = min(chain_results, key=lambda r: r[2])
+
+            self.best_solution = Solution(self.data)
+            self.best_solution.ward_idx = best_ward.astype(np.int32, copy=False)
+            self.best_solution.day = best_day.astype(np.int32, copy=False)
+            self.best_solution.evaluate(self.lambda1, self.lambda2)
+
+            self.solve_time = time.time() - start_time
+
+            if verbose:
+                print(f"\n✓ Concluído em {self.solve_time:.2f}s")
+                print(f"Melhor solução: {self.best_solution.objective_value:.2f}")
+                print(f"Viável: {self.best_solution.feasible}")
+
+            return {
+                'objective_value': self.best_solution.objective_value,
+                'solve_time': self.solve_time,
+                'solution': self.best_solution.allocation,
+                'solution_arr': np.stack((best_ward, best_day), axis=1).astype(np.int32),
+                'feasible': self.best_solution.feasible
+            }
+
+        # Agenda de temperaturas pré-calculada: o arrefecimento geométrico
+        # com paragem em temp < 0.01 define à partida quantas iterações são
+        # úteis, por isso o loop deixa de multiplicar e comparar por iteração
+        if 0 < cooling_rate < 1:
+            n_iters = min(max_iterations, math.ceil(
+                math.log(0.01 / initial_temp) / math.log(cooling_rate)))
+        else:
+            n_iters = max_iterations
+        temps = initial_temp * (cooling_rate ** np.arange(n_iters))
+
+        for chain in range(num_chains):
+            if chain > 0:
+                # Cada cadeia extra recomeça da solução inicial, com a sua
+                # própria sequência de movimentos do PRNG partilhado
+                current = self._generate_initial_solution()
+
+            cur_obj = current.objective_value
+
+            # Ligações locais: evitar lookups globais e de atributo dentro
+            # do loop quente
+            _exp = math.exp
+            _uniform = self._next_uniform
+            _propose = self._propose_move
+            _apply = current.apply_move
+            l1, l2 = self.lambda1, self.lambda2
+
+            for iteration, temperature in enumerate(temps):
+                # Propor um movimento e aplicá-lo incrementalmente; o inverso
+                # com os valores antigos desfaz o movimento se for rejeitado
+                moves = _propose(current)
+                if moves:
+                    undo = [(i, int(current.ward_idx[i]), int(current.day[i]))
+                            for i, _, _ in moves]
+                    for mv in moves:
+                        new_obj = _apply(*mv, l1, l2)
+
+                    # Aceitar ou rejeitar
+                    delta = new_obj - cur_obj
+
+                    # Rejeição garantida (delta >= 40·T): sem sorteio nem exp
+                    if delta < 0 or (temperature > 0 and
+                                     delta < 40.0 * temperature and
+                                     _uniform() < _exp(-delta / temperature)):
+                        cur_obj = new_obj
+
+                        # Atualizar melhor solução
+                        if cur_obj < self.best_solution.objective_value:
+                            self.best_solution.copy_from(current)
+                            if verbose and iteration % 1000 == 0:
+                                print(f"Iteração {iteration}: Nova melhor solução = {self.best_solution.objective_value:.2f}")
+                    else:
+                        for mv in reversed(undo):
+                            _apply(*mv, l1, l2)
         
         self.solve_time = time.time() - start_time
-        
+
         if verbose:
             print(f"\n✓ Concluído em {self.solve_time:.2f}s")
             print(f"Melhor solução: {self.best_solution.objective_value:.2f}")
             print(f"Viável: {self.best_solution.feasible}")
-        
+
         return {
             'objective_value': self.best_solution.objective_value,
             'solve_time': self.solve_time,
             'solution': self.best_solution.allocation,
+            'solution_arr': np.stack(
+                (self.best_solution.ward_idx, self.best_solution.day),
+                axis=1).astype(np.int32),
             'feasible': self.best_solution.feasible
         }
 
 
 class TabuSearch:
     """Implementação de Tabu Search."""
-    
-    def __init__(self, data: PatientAllocationData, lambda1=0.5, lambda2=0.5):
+
+    def __init__(self, data: PatientAllocationData, lambda1=0.5, lambda2=0.5,
+                 seed=None):
         self.data = data
         self.lambda1 = lambda1
         self.lambda2 = lambda2
-        
+
+        # O TS gera vizinhos através de um SA interno; a seed própria
+        # permite derivar a dele de forma reprodutível
+        self.rng = np.random.default_rng(seed)
+
         self.best_solution = None
         self.solve_time = None
     
@@ -352,44 +1120,112 @@ class TabuSearch:
         start_time = time.time()
         
         # Usar SA para gerar solução inicial
-        sa = SimulatedAnnealing(self.data, self.lambda1, self.lambda2)
+        sa = SimulatedAnnealing(self.data, self.lambda1, self.lambda2,
+                                seed=int(self.rng.integers(2**31)))
         current = sa._generate_initial_solution()
         self.best_solution = current.copy()
         
-        tabu_list = []
-        
+        # Lista tabu: deque limitada dos movimentos recentes mais um set
+        # espelho para pertença em O(1); a deque evita o pop(0) linear
+        tabu_list = deque(maxlen=tabu_tenure)
+        tabu_set = set()
+
         if verbose:
             print(f"Solução inicial: {current.objective_value:.2f}")
-        
-        for iteration in range(max_iterations):
-            # Gerar vizinhança
-            neighbors = []
-            for _ in range(20):  # Gerar 20 vizinhos
-                neighbor = sa._get_neighbor(current)
-                neighbors.append(neighbor)
-            
-            # Ordenar por qualidade
-            neighbors.sort(key=lambda x: x.objective_value)
-            
-            # Escolher melhor vizinho não-tabu
-            for neighbor in neighbors:
-                move = str(neighbor.allocation)
-                
-                if move not in tabu_list or neighbor.objective_value < self.best_solution.objective_value:
-                    current = neighbor
-                    tabu_list.append(move)
-                    
-                    # Manter tamanho da lista tabu
-                    if len(tabu_list) > tabu_tenure:
-                        tabu_list.pop(0)
-                    
-                    # Atualizar melhor
-                    if current.objective_value < self.best_solution.objective_value:
-                        self.best_solution = current.copy()
-                        if verbose and iteration % 500 == 0:
-                            print(f"Iteração {iteration}: Nova melhor = {self.best_solution.objective_value:.2f}")
-                    
-                    break
+
+        soa = current.soa
+        compat_flat = soa['compat_wards_flat']
+        compat_offsets = soa['compat_offsets']
+        P = current.ward_idx.shape[0]
+        sample_size = min(20, P)
+
+        if NUMBA_AVAILABLE:
+            # Caminho rápido: a enumeração da vizinhança corre dentro do
+            # kernel Numba sobre os acumuladores incrementais; a lista
+            # tabu vive num ring buffer (tenure, 3) lido pelo kernel
+            current._build_move_caches()
+            tabu_arr = np.full((tabu_tenure, 3), -1, dtype=np.int64)
+            tabu_pos = 0
+            n_tabu = 0
+
+            for iteration in range(max_iterations):
+                sample = self.rng.choice(P, size=sample_size, replace=False)
+
+                bi, bw, bd, _ = _ts_enumerate_kernel(
+                    sample.astype(np.int64), current.ward_idx, current.day,
+                    current._occupancy, current._norm_workload,
+                    current._ot_used, current._delay_sum, current._otu_cost,
+                    soa['earliest'], soa['latest'], soa['los'],
+                    soa['surgery'], soa['spec_of'], soa['workload'],
+                    soa['compat_factor'], soa['bed_capacity'],
+                    soa['workload_capacity'], soa['carryover_patients'],
+                    soa['ot_time'], soa['num_days'],
+                    self.data.weight_delay, self.data.weight_overtime,
+                    self.data.weight_undertime, self.lambda1, self.lambda2,
+                    compat_flat, compat_offsets, tabu_arr, n_tabu,
+                    self.best_solution.objective_value)
+
+                if bi < 0:
+                    continue
+
+                current.apply_move(int(bi), int(bw), int(bd),
+                                   self.lambda1, self.lambda2)
+
+                tabu_arr[tabu_pos, 0] = bi
+                tabu_arr[tabu_pos, 1] = bw
+                tabu_arr[tabu_pos, 2] = bd
+                tabu_pos = (tabu_pos + 1) % tabu_tenure
+                n_tabu = min(n_tabu + 1, tabu_tenure)
+
+                # Atualizar melhor
+                if current.objective_value < self.best_solution.objective_value:
+                    self.best_solution.copy_from(current)
+                    if verbose and iteration % 500 == 0:
+                        print(f"Iteração {iteration}: Nova melhor = {self.best_solution.objective_value:.2f}")
+
+        else:
+            for iteration in range(max_iterations):
+                # Enumerar uma vizinhança estruturada: para uma amostra de
+                # pacientes, avaliar todos os candidatos (enfermaria, dia)
+                # com move_delta e ficar com o melhor não-tabu
+                best_move = None
+                best_obj = float('inf')
+
+                for i in self.rng.choice(P, size=sample_size, replace=False):
+                    i = int(i)
+                    cur_w, cur_d = int(current.ward_idx[i]), int(current.day[i])
+                    last_day = min(int(soa['latest'][i]) + 1, soa['num_days'])
+
+                    for t in range(compat_offsets[i], compat_offsets[i + 1]):
+                        w = int(compat_flat[t])
+                        for d in range(int(soa['earliest'][i]), last_day):
+                            if w == cur_w and d == cur_d:
+                                continue
+                            obj = current.move_delta(i, w, d, self.lambda1, self.lambda2)
+                            if obj < best_obj:
+                                move = ((i, w, d),)
+                                if move not in tabu_set or obj < self.best_solution.objective_value:
+                                    best_obj = obj
+                                    best_move = move
+
+                if best_move is None:
+                    continue
+
+                (i, w, d), = best_move
+                current.apply_move(i, w, d, self.lambda1, self.lambda2)
+
+                # Com a deque cheia, o append expulsa o movimento mais
+                # antigo; retirá-lo também do set
+                if len(tabu_list) == tabu_tenure:
+                    tabu_set.discard(tabu_list[0])
+                tabu_list.append(best_move)
+                tabu_set.add(best_move)
+
+                # Atualizar melhor
+                if current.objective_value < self.best_solution.objective_value:
+                    self.best_solution.copy_from(current)
+                    if verbose and iteration % 500 == 0:
+                        print(f"Iteração {iteration}: Nova melhor = {self.best_solution.objective_value:.2f}")
         
         self.solve_time = time.time() - start_time
         
@@ -401,6 +1237,9 @@ class TabuSearch:
             'objective_value': self.best_solution.objective_value,
             'solve_time': self.solve_time,
             'solution': self.best_solution.allocation,
+            'solution_arr': np.stack(
+                (self.best_solution.ward_idx, self.best_solution.day),
+                axis=1).astype(np.int32),
             'feasible': self.best_solution.feasible
         }
 
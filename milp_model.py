@@ -3,33 +3,59 @@ Modelo MILP (Mixed Integer Linear Programming) para o problema de alocação de
 Usa o Gurobi como solver para encontrar a solução ótima (Método 1 - Branch & Bound).
 """
 
+import atexit
+import os
 import gurobipy as gp
 from gurobipy import GRB
 import time
 from data_parser import PatientAllocationData
 
+# Ambiente Gurobi partilhado por todos os modelos (criado preguiçosamente):
+# criar um ambiente é caro (verificação de licença, parse de parâmetros),
+# partilhar um único amortiza esse custo entre os vários métodos
+_shared_env = None
+
+
+def get_gurobi_env():
+    """Devolve o ambiente Gurobi partilhado, criando-o na primeira chamada."""
+    global _shared_env
+    if _shared_env is None:
+        _shared_env = gp.Env(empty=True)
+        _shared_env.setParam('OutputFlag', 0)
+        _shared_env.start()
+        atexit.register(_shared_env.dispose)
+    return _shared_env
+
 
 class PatientAllocationMILP:
     """Modelo MILP para alocação de pacientes em hospitais."""
     
-    def __init__(self, data: PatientAllocationData, lambda1=0.5, lambda2=0.5):
+    def __init__(self, data: PatientAllocationData, lambda1=0.5, lambda2=0.5,
+                 model=None, env=None):
         """
         Inicializa o modelo MILP.
-        
+
         Args:
             data: Objeto com os dados do problema
             lambda1: Peso do objetivo 1 (custo operacional)
             lambda2: Peso do objetivo 2 (equilíbrio de carga)
+            model: Modelo Gurobi já existente (opcional; ver from_model)
+            env: Ambiente Gurobi a usar (por defeito o partilhado)
         """
         self.data = data
         self.lambda1 = lambda1
         self.lambda2 = lambda2
-        
-        # Criar modelo Gurobi
-        self.model = gp.Model("PatientAllocation")
+
+        # Criar modelo Gurobi (ou adotar um já construído)
+        if model is not None:
+            self.model = model
+        else:
+            self.model = gp.Model("PatientAllocation",
+                                  env=env if env is not None else get_gurobi_env())
         
         # Variáveis de decisão
         self.y = {}  # y[p,w,d] = 1 se paciente p é admitido na enfermaria w no dia d
+        self.y_by_patient = {}  # {p: [((p,w,d), var), ...]} índice para warm starts
         self.x = {}  # x[w,d] = carga de trabalho normalizada na enfermaria w no dia d
         self.z = {}  # z = máximo da carga de trabalho (para minimizar)
         self.v_overtime = {}   # v[s,d] = overtime da especialização s no dia d
@@ -39,23 +65,129 @@ class PatientAllocationMILP:
         self.solution = None
         self.objective_value = None
         self.solve_time = None
-        
-    def build_model(self):
-        """Constrói o modelo completo com variáveis, restrições e função objetivo."""
+
+    @classmethod
+    def from_model(cls, data: PatientAllocationData, model,
+                   lambda1=0.5, lambda2=0.5):
+        """
+        Reconstrói um PatientAllocationMILP a partir de um modelo Gurobi
+        já construído (tipicamente obtido via model.copy()), sem voltar
+        a criar variáveis nem restrições.
+
+        Percorre os mesmos conjuntos de índices de _create_variables e
+        recupera cada variável por nome com getVarByName, repovoando os
+        dicionários y/x/z/v/u.
+        """
+        milp = cls(data, lambda1, lambda2, model=model)
+        model.update()
+        milp._rebind_variables()
+        return milp
+
+    def _rebind_variables(self):
+        """
+        Repovoa os dicionários y/x/z/v/u a partir de self.model, percorrendo
+        os mesmos conjuntos de índices de _create_variables e recuperando
+        cada variável por nome com getVarByName.
+        """
+        data = self.data
+        model = self.model
+
+        for patient_id, patient in data.patients.items():
+            spec = patient['specialization']
+            for ward_name, ward in data.wards.items():
+                if (spec == ward['major_specialization'] or
+                        spec in ward['minor_specializations']):
+                    for d in range(patient['earliest'], patient['latest'] + 1):
+                        if d < data.num_days:
+                            var = model.getVarByName(f"y_{patient_id}_{ward_name}_{d}")
+                            self.y[patient_id, ward_name, d] = var
+                            self.y_by_patient.setdefault(patient_id, []).append(
+                                ((patient_id, ward_name, d), var))
+
+        for ward_name in data.wards.keys():
+            for d in range(data.num_days):
+                self.x[ward_name, d] = model.getVarByName(f"x_{ward_name}_{d}")
+
+        self.z = model.getVarByName("z_max_workload")
+
+        for spec in data.specialisms.keys():
+            for d in range(data.num_days):
+                self.v_overtime[spec, d] = model.getVarByName(f"v_overtime_{spec}_{d}")
+                self.u_undertime[spec, d] = model.getVarByName(f"u_undertime_{spec}_{d}")
+
+    def _update_objective_coefficients(self):
+        """
+        Atualiza apenas os coeficientes do objetivo para os λ atuais, via
+        um único setAttr vetorizado — a estrutura do modelo (restrições)
+        não depende de λ, só os coeficientes.
+        """
+        vars_list = []
+        coefs = []
+
+        for (patient_id, ward_name, d), var in self.y.items():
+            vars_list.append(var)
+            coefs.append(self.lambda1 * self.data.weight_delay *
+                         (d - self.data.patients[patient_id]['earliest']))
+
+        for var in self.v_overtime.values():
+            vars_list.append(var)
+            coefs.append(self.lambda1 * self.data.weight_overtime)
+
+        for var in self.u_undertime.values():
+            vars_list.append(var)
+            coefs.append(self.lambda1 * self.data.weight_undertime)
+
+        vars_list.append(self.z)
+        coefs.append(self.lambda2)
+
+        self.model.setAttr(GRB.Attr.Obj, vars_list, coefs)
+        self.model.ModelSense = GRB.MINIMIZE
+        self.model.update()
+
+    def build_model(self, cache_path=None):
+        """
+        Constrói o modelo completo com variáveis, restrições e função objetivo.
+
+        Args:
+            cache_path: Caminho opcional para um cache do modelo (.mps.bz2).
+                Se o ficheiro existir, o modelo é lido com gp.read e só os
+                coeficientes do objetivo são refrescados para os λ atuais
+                (a estrutura não depende de λ); caso contrário o modelo é
+                construído normalmente e escrito para o cache.
+        """
+        if cache_path is not None and os.path.exists(cache_path):
+            print("Lendo modelo MILP do cache...")
+            self.model = gp.read(cache_path, env=get_gurobi_env())
+            self._rebind_variables()
+            self._update_objective_coefficients()
+
+            print("✓ Modelo carregado do cache!")
+            print(f"  - Variáveis: {self.model.NumVars}")
+            print(f"  - Restrições: {self.model.NumConstrs}")
+            return
+
         print("Construindo o modelo MILP...")
-        
+
         # 1. CRIAR VARIÁVEIS DE DECISÃO
         self._create_variables()
-        
+
         # 2. ADICIONAR RESTRIÇÕES
         self._add_constraints()
-        
+
         # 3. DEFINIR FUNÇÃO OBJETIVO
         self._set_objective()
-        
+
         print("✓ Modelo construído com sucesso!")
         print(f"  - Variáveis: {self.model.NumVars}")
         print(f"  - Restrições: {self.model.NumConstrs}")
+
+        if cache_path is not None:
+            cache_dir = os.path.dirname(cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self.model.update()
+            self.model.write(cache_path)
+            print(f"  - Cache escrito: {cache_path}")
     
     def _create_variables(self):
         """Cria todas as variáveis de decisão do modelo."""
@@ -74,10 +206,13 @@ class PatientAllocationMILP:
                     
                     for d in range(earliest, latest + 1):
                         if d < self.data.num_days:
-                            self.y[patient_id, ward_name, d] = self.model.addVar(
+                            var = self.model.addVar(
                                 vtype=GRB.BINARY,
                                 name=f"y_{patient_id}_{ward_name}_{d}"
                             )
+                            self.y[patient_id, ward_name, d] = var
+                            self.y_by_patient.setdefault(patient_id, []).append(
+                                ((patient_id, ward_name, d), var))
         
         # X[w,d] - Carga de trabalho normalizada
         print("  Criando variáveis X (carga de trabalho)...")
@@ -254,15 +389,16 @@ class PatientAllocationMILP:
         
         print(f"  ✓ Objetivo definido: {self.lambda1}*f1 + {self.lambda2}*f2")
     
-    def solve(self, time_limit=600, threads=4, verbose=True):
+    def solve(self, time_limit=600, threads=4, verbose=True, callback=None):
         """
         Resolve o modelo usando Gurobi.
-        
+
         Args:
             time_limit: Tempo limite em segundos (padrão: 600s = 10min)
             threads: Número de threads a usar
             verbose: Se True, mostra output do Gurobi
-        
+            callback: Função callback do Gurobi (opcional), passada ao optimize
+
         Returns:
             Dict com os resultados da solução
         """
@@ -273,12 +409,16 @@ class PatientAllocationMILP:
         # Configurar parâmetros
         self.model.Params.TimeLimit = time_limit
         self.model.Params.Threads = threads
-        if not verbose:
-            self.model.Params.OutputFlag = 0
+        # Explícito nos dois sentidos: o ambiente partilhado nasce com
+        # OutputFlag=0, por isso verbose=True tem de o reativar
+        self.model.Params.OutputFlag = 1 if verbose else 0
         
         # Resolver
         start_time = time.time()
-        self.model.optimize()
+        if callback is not None:
+            self.model.optimize(callback)
+        else:
+            self.model.optimize()
         self.solve_time = time.time() - start_time
         
         # Processar resultados
@@ -315,6 +455,16 @@ class PatientAllocationMILP:
                     'patient_data': self.data.patients[patient_id]
                 }
     
+    def dispose(self):
+        """
+        Liberta explicitamente os recursos do modelo Gurobi.
+
+        O ambiente partilhado continua vivo (é fechado no atexit); só o
+        modelo é descartado. Chamar quando o modelo já não for preciso —
+        os resultados extraídos (solution/objective_value) permanecem.
+        """
+        self.model.dispose()
+
     def _get_results(self):
         """Retorna um dicionário com os resultados."""
         return {
@@ -5,6 +5,9 @@ Este script processa vários ficheiros .dat de forma automática.
 Ajusta os parâmetros abaixo conforme necessário.
 """
 
+import argparse
+import sys
+
 from batch_analysis import BatchAnalyzer
 
 # =============================================================================
@@ -38,41 +41,72 @@ TIME_LIMIT = 120  # 2 minutos
 # NÃO MEXER ABAIXO (a menos que saibas o que estás a fazer)
 # =============================================================================
 
+def parse_args():
+    """Argumentos da linha de comandos (os defaults vêm da configuração acima)."""
+    parser = argparse.ArgumentParser(
+        description='Processamento em batch - alocação de pacientes')
+    parser.add_argument('--data-dir', default=DATA_DIR,
+                        help='Diretório com os ficheiros .dat')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                        help='Diretório para salvar resultados')
+    parser.add_argument('--pattern', default=PATTERN,
+                        help="Padrão de ficheiros (ex: '*.dat', 's0*.dat')")
+    parser.add_argument('--max-files', type=int, default=MAX_FILES,
+                        help='Número máximo de ficheiros (0 = todos)')
+    parser.add_argument('--methods', nargs='+', default=METHODS,
+                        choices=['bb', 'sa', 'tabu', 'hybrid'],
+                        help='Métodos a executar')
+    parser.add_argument('--lambda1', type=float, default=LAMBDA1,
+                        help='Peso do custo operacional')
+    parser.add_argument('--lambda2', type=float, default=LAMBDA2,
+                        help='Peso do equilíbrio de carga')
+    parser.add_argument('--time-limit', type=int, default=TIME_LIMIT,
+                        help='Tempo limite por método (segundos)')
+    parser.add_argument('-y', '--yes', action='store_true',
+                        help='Não pedir confirmação (útil para cron/CI)')
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+
     print("="*80)
     print("PROCESSAMENTO EM BATCH - ALOCAÇÃO DE PACIENTES")
     print("="*80)
-    print(f"\n📁 Diretório de dados: {DATA_DIR}")
-    print(f"📁 Diretório de outputs: {OUTPUT_DIR}")
-    print(f"📊 Padrão de ficheiros: {PATTERN}")
-    print(f"🔢 Máximo de ficheiros: {MAX_FILES if MAX_FILES else 'TODOS'}")
-    print(f"⚙️  Métodos: {METHODS}")
-    print(f"⏱️  Tempo limite: {TIME_LIMIT}s por método")
-    print(f"⚖️  Pesos: λ1={LAMBDA1}, λ2={LAMBDA2}")
-    
-    resposta = input("\n▶️  Continuar? (s/n): ")
-    
-    if resposta.lower() != 's':
-        print("❌ Cancelado pelo utilizador.")
-        return
-    
+    print(f"\n📁 Diretório de dados: {args.data_dir}")
+    print(f"📁 Diretório de outputs: {args.output_dir}")
+    print(f"📊 Padrão de ficheiros: {args.pattern}")
+    print(f"🔢 Máximo de ficheiros: {args.max_files if args.max_files else 'TODOS'}")
+    print(f"⚙️  Métodos: {args.methods}")
+    print(f"⏱️  Tempo limite: {args.time_limit}s por método")
+    print(f"⚖️  Pesos: λ1={args.lambda1}, λ2={args.lambda2}")
+
+    # Só perguntar em execuções interativas: com --yes (ou stdin
+    # redirecionado, ex.: nohup/cron) o batch arranca sem bloquear
+    if not args.yes and sys.stdin.isatty():
+        resposta = input("\n▶️  Continuar? (s/n): ")
+
+        if resposta.lower() != 's':
+            print("❌ Cancelado pelo utilizador.")
+            return
+
     # Criar analisador
-    analyzer = BatchAnalyzer(DATA_DIR, OUTPUT_DIR)
-    
+    analyzer = BatchAnalyzer(args.data_dir, args.output_dir)
+
     # Executar análise
     analyzer.run_batch_analysis(
-        pattern=PATTERN,
-        max_files=MAX_FILES,
-        methods=METHODS,
-        lambda1=LAMBDA1,
-        lambda2=LAMBDA2,
-        time_limit=TIME_LIMIT
+        pattern=args.pattern,
+        max_files=args.max_files or None,
+        methods=args.methods,
+        lambda1=args.lambda1,
+        lambda2=args.lambda2,
+        time_limit=args.time_limit
     )
     
     print("\n" + "="*80)
     print("✅ CONCLUÍDO!")
     print("="*80)
-    print(f"\nResultados salvos em: {OUTPUT_DIR}/")
+    print(f"\nResultados salvos em: {args.output_dir}/")
     print("\nFicheiros gerados:")
     print("  • batch_results.csv       - Tabela com todos os resultados")
     print("  • batch_comparison.png    - Gráficos comparativos")